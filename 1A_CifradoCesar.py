@@ -2,6 +2,12 @@
 # Autores: Guillermo Campo y Daniel Zambrano
 # Universidad Militar Nueva Granada
 
+import os
+import sys
+import time
+
+from seguridad.metricas import instrumentar
+
 '''
 ¿Qué es el Cifrado César?
  - Es un cifrado por sustitución monoalfabético: cada letra se reemplaza
@@ -18,6 +24,7 @@
    * Si no es letra (o no está en A-Z/a-z) → la deja igual.
 '''
 
+@instrumentar
 def cifrar_cesar(texto, clave):
 
     resultado = ""
@@ -107,10 +114,100 @@ def ataque_fuerza_bruta(texto_cifrado):
       - O(26 * n), donde n es la longitud del texto.
     """
 
+# ============================================================
+# Variante para bytes (buffers de sockets, archivos, mmap...)
+# ============================================================
+'''
+cifrar_cesar_bytes / descifrar_cesar_bytes trabajan directamente sobre
+cualquier objeto con protocolo de buffer (bytes, bytearray, memoryview,
+mmap) sin pasar por str:
+ - César sobre bytes es una sustitución fija byte -> byte, así que se
+   precalcula una tabla de 256 entradas y se aplica con bytes.translate
+   (en C) por tramos de TRAMO_BYTES: la memoria extra es un tramo, no el
+   buffer completo.
+ - Solo se desplazan A-Z y a-z; el resto de bytes (incluidos los no ASCII)
+   se copia igual. Para texto ASCII el resultado es idéntico a
+   cifrar_cesar(texto.decode(), clave).encode().
+ - 'salida' (opcional) es un buffer escribible del llamador (p. ej. un
+   bytearray) de al menos len(datos) bytes; puede ser el mismo que 'datos'
+   para cifrar en el sitio. Sin 'salida' se devuelve un bytearray nuevo.
+'''
+TRAMO_BYTES = 1 << 20
+
+def _tabla_cesar(clave):
+    tabla = bytearray(range(256))
+    for inicio in (ord('A'), ord('a')):
+        for i in range(26):
+            tabla[inicio + i] = inicio + (i + clave) % 26
+    return bytes(tabla)
+
+def _cesar_bytes(datos, clave, salida):
+    entrada = memoryview(datos).cast('B')
+    n = entrada.nbytes
+    if salida is None:
+        salida = bytearray(n)
+    destino = memoryview(salida).cast('B')
+    if destino.readonly or destino.nbytes < n:
+        raise ValueError(f"La salida debe ser un buffer escribible de al menos {n} bytes")
+
+    tabla = _tabla_cesar(clave)
+    for inicio in range(0, n, TRAMO_BYTES):
+        fin = min(inicio + TRAMO_BYTES, n)
+        destino[inicio:fin] = entrada[inicio:fin].tobytes().translate(tabla)
+    return salida
+
+@instrumentar
+def cifrar_cesar_bytes(datos, clave, salida=None):
+    return _cesar_bytes(datos, clave, salida)
+
+@instrumentar
+def descifrar_cesar_bytes(datos, clave, salida=None):
+    # Descifrar es cifrar con la clave en negativo
+    return _cesar_bytes(datos, -clave, salida)
+
+def benchmark_bytes(tamaño=100 * (1 << 20), tamaño_str=1 << 20, clave=7):
+    """
+    MB/s de cifrar_cesar_bytes sobre 'tamaño' bytes de texto ASCII frente a la
+    versión str (decode -> cifrar_cesar -> encode) sobre 'tamaño_str' bytes
+    (la versión str es demasiado lenta para 100 MB). Comprueba que coinciden.
+    """
+    # Texto ASCII imprimible aleatorio: cada byte aleatorio se lleva a 32..126
+    imprimible = bytes(32 + b % 95 for b in range(256))
+    datos = os.urandom(tamaño).translate(imprimible)
+
+    muestra = datos[:tamaño_str]
+    inicio = time.perf_counter()
+    esperado = cifrar_cesar(muestra.decode('ascii'), clave).encode('ascii')
+    segundos_str = time.perf_counter() - inicio
+    if cifrar_cesar_bytes(muestra, clave) != esperado:
+        raise AssertionError("cifrar_cesar_bytes no coincide con cifrar_cesar")
+
+    salida = bytearray(tamaño)
+    inicio = time.perf_counter()
+    cifrar_cesar_bytes(datos, clave, salida)
+    segundos_bytes = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    descifrar_cesar_bytes(salida, clave, salida)  # en el sitio
+    segundos_sitio = time.perf_counter() - inicio
+    if salida != datos:
+        raise AssertionError("descifrar_cesar_bytes no recupera los datos")
+
+    return {"mb_s_str": tamaño_str / segundos_str / 1e6,
+            "mb_s_bytes": tamaño / segundos_bytes / 1e6,
+            "mb_s_bytes_en_sitio": tamaño / segundos_sitio / 1e6}
+
 # ============================================================
 # Programa principal: Pruebas de cifrado y descifrado
 # ============================================================
-if __name__ == "__main__":
+if __name__ == "__main__" and "--bench" in sys.argv:
+    # Uso: python 1A_CifradoCesar.py --bench [MB]
+    argumentos = [a for a in sys.argv[1:] if a != "--bench"]
+    tamaño = int(argumentos[0]) * (1 << 20) if argumentos else 100 * (1 << 20)
+    for clave, valor in benchmark_bytes(tamaño).items():
+        print(f"{clave}: {valor:.1f}")
+
+elif __name__ == "__main__":
     print("CIFRADO CESAR - TALLER DE CRIPTOGRAFIA")
     
     # -------------------------
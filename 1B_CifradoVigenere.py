@@ -2,6 +2,16 @@
 # Autores: Guillermo Campo y Daniel Zambrano
 # Universidad Militar Nueva Granada
 
+import os
+import sys
+import time
+
+from seguridad import importar_perezoso
+from seguridad.metricas import instrumentar
+
+# NumPy (solo para las variantes bytes) se carga en el primer uso
+np = importar_perezoso("numpy")
+
 '''
 ¿Qué es el Cifrado Vigenère?
  - Es un cifrado polialfabético: cada letra se cifra con un desplazamiento
@@ -45,6 +55,7 @@ def preparar_clave(texto, clave):
     - Se ignoran los espacios y caracteres no alfabéticos.
     """
 
+@instrumentar
 def cifrar_vigenere(texto, clave):
     
     clave_preparada = preparar_clave(texto, clave)
@@ -169,10 +180,119 @@ def mostrar_proceso_cifrado(texto, clave):
       3) Mantener mayúsculas/minúsculas del texto original.
     """
 
+# ============================================================
+# Variante para bytes (buffers de sockets, archivos, mmap...)
+# ============================================================
+'''
+cifrar_vigenere_bytes / descifrar_vigenere_bytes trabajan directamente
+sobre cualquier objeto con protocolo de buffer (bytes, bytearray,
+memoryview, mmap) sin pasar por str, vectorizado con NumPy:
+ - Por tramos de TRAMO_BYTES: se extraen las letras A-Z/a-z del tramo.
+   Como los demás bytes no hacen avanzar la clave (igual que en la
+   versión str), los desplazamientos de esas letras son la clave repetida
+   desde la posición en que quedó el tramo anterior. Se aplica
+   (letra ± clave) % 26 conservando mayúsculas/minúsculas y se vuelven a
+   colocar en su sitio; todo en uint8, sin índices intermedios.
+ - El resto de bytes (incluidos los no ASCII) se copia igual. Para texto
+   ASCII el resultado es idéntico a la versión str.
+ - 'salida' (opcional) es un buffer escribible del llamador (p. ej. un
+   bytearray) de al menos len(datos) bytes; puede ser el mismo que 'datos'
+   para cifrar en el sitio. Sin 'salida' se devuelve un bytearray nuevo.
+'''
+TRAMO_BYTES = 1 << 20
+
+def _desplazamientos_clave(clave):
+    # Misma normalización que preparar_clave(): mayúsculas y sin espacios
+    if isinstance(clave, (bytes, bytearray, memoryview)):
+        clave = bytes(clave).decode('ascii')
+    clave = clave.upper().replace(" ", "")
+    if not clave:
+        raise ValueError("La clave no puede estar vacía")
+    return [(ord(c) - ord('A')) % 26 for c in clave]
+
+def _vigenere_bytes(datos, clave, salida, signo):
+    # Descifrar es cifrar con el desplazamiento opuesto (26 - d)
+    desplazamientos = np.array([(signo * d) % 26 for d in _desplazamientos_clave(clave)], dtype=np.uint8)
+    entrada = np.frombuffer(memoryview(datos).cast('B'), dtype=np.uint8)
+    n = entrada.size
+    if salida is None:
+        salida = bytearray(n)
+    destino = np.frombuffer(memoryview(salida).cast('B'), dtype=np.uint8)
+    if not destino.flags.writeable or destino.size < n:
+        raise ValueError(f"La salida debe ser un buffer escribible de al menos {n} bytes")
+
+    letras_previas = 0
+    for inicio in range(0, n, TRAMO_BYTES):
+        trozo = entrada[inicio:inicio + TRAMO_BYTES]
+        # (byte | 0x20) - 'a' (con desbordamiento de uint8) está en 0..25 solo para A-Z y a-z
+        letras = (trozo | 0x20) - np.uint8(ord('a')) < 26
+        seleccion = trozo[letras]  # copia: se lee antes de escribir (vale en el sitio)
+
+        # Clave repetida desde donde quedó el tramo anterior
+        fase = np.roll(desplazamientos, -(letras_previas % desplazamientos.size))
+        desplazamiento = np.tile(fase, seleccion.size // fase.size + 1)[:seleccion.size]
+        base = (seleccion & 0x20) | np.uint8(ord('A'))  # 'A' para mayúsculas, 'a' para minúsculas
+        cifrado = (seleccion - base + desplazamiento) % 26 + base
+
+        tramo_destino = destino[inicio:inicio + trozo.size]
+        tramo_destino[...] = trozo
+        tramo_destino[letras] = cifrado
+        letras_previas += seleccion.size
+    return salida
+
+@instrumentar
+def cifrar_vigenere_bytes(datos, clave, salida=None):
+    return _vigenere_bytes(datos, clave, salida, 1)
+
+@instrumentar
+def descifrar_vigenere_bytes(datos, clave, salida=None):
+    return _vigenere_bytes(datos, clave, salida, -1)
+
+def benchmark_bytes(tamaño=100 * (1 << 20), tamaño_str=1 << 20, clave="CRIPTOGRAFIA"):
+    """
+    MB/s de cifrar_vigenere_bytes sobre 'tamaño' bytes de texto ASCII frente a
+    la versión str (decode -> cifrar_vigenere -> encode) sobre 'tamaño_str' bytes
+    (la versión str es demasiado lenta para 100 MB). Comprueba que coinciden.
+    """
+    # Texto ASCII imprimible aleatorio: cada byte aleatorio se lleva a 32..126
+    imprimible = bytes(32 + b % 95 for b in range(256))
+    datos = os.urandom(tamaño).translate(imprimible)
+
+    muestra = datos[:tamaño_str]
+    inicio = time.perf_counter()
+    esperado = cifrar_vigenere(muestra.decode('ascii'), clave).encode('ascii')
+    segundos_str = time.perf_counter() - inicio
+    if cifrar_vigenere_bytes(muestra, clave) != esperado:
+        raise AssertionError("cifrar_vigenere_bytes no coincide con cifrar_vigenere")
+    if descifrar_vigenere_bytes(esperado, clave) != descifrar_vigenere(esperado.decode('ascii'), clave).encode('ascii'):
+        raise AssertionError("descifrar_vigenere_bytes no coincide con descifrar_vigenere")
+
+    salida = bytearray(tamaño)
+    inicio = time.perf_counter()
+    cifrar_vigenere_bytes(datos, clave, salida)
+    segundos_bytes = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    descifrar_vigenere_bytes(salida, clave, salida)  # en el sitio
+    segundos_sitio = time.perf_counter() - inicio
+    if salida != datos:
+        raise AssertionError("descifrar_vigenere_bytes no recupera los datos")
+
+    return {"mb_s_str": tamaño_str / segundos_str / 1e6,
+            "mb_s_bytes": tamaño / segundos_bytes / 1e6,
+            "mb_s_bytes_en_sitio": tamaño / segundos_sitio / 1e6}
+
 # ============================================================
 # Programa principal: Demostración
 # ============================================================
-if __name__ == "__main__":
+if __name__ == "__main__" and "--bench" in sys.argv:
+    # Uso: python 1B_CifradoVigenere.py --bench [MB]
+    argumentos = [a for a in sys.argv[1:] if a != "--bench"]
+    tamaño = int(argumentos[0]) * (1 << 20) if argumentos else 100 * (1 << 20)
+    for clave, valor in benchmark_bytes(tamaño).items():
+        print(f"{clave}: {valor:.1f}")
+
+elif __name__ == "__main__":
     print("CIFRADO VIGENERE - TALLER DE CRIPTOGRAFIA")
     print("="*50)
     
@@ -2,7 +2,10 @@
 # Autores: Guillermo Campo y Daniel Zambrano
 # Universidad Militar Nueva Granada
 
-from cryptography.fernet import Fernet
+from seguridad import importar_perezoso
+
+# cryptography se carga en el primer uso (importar este módulo es inmediato)
+_fernet = importar_perezoso("cryptography.fernet")
 
 '''
  CIFRADO SIMÉTRICO MODERNO CON FERNET (AES + HMAC)
@@ -27,16 +30,8 @@ from cryptography.fernet import Fernet
 '''
 Esta clave debe mantenerse privada, ya que con ella se puede cifrar y descifrar.
 '''
-clave = Fernet.generate_key()
-fernet = Fernet(clave)
-print(f"Clave generada: {clave.decode()}")
-
-# --- 2. Definir un mensaje secreto ---
-'''
-Este es el texto en claro que deseamos proteger.
-'''
-mensaje_original = "Este es un mensaje confidencial de Guillermo y Daniel"
-print(f"\nMensaje original: {mensaje_original}")
+def generar_clave():
+    return _fernet.Fernet.generate_key()
 
 # --- 3. Cifrar el mensaje ---
 '''
@@ -44,8 +39,8 @@ El método encrypt() recibe los datos en bytes.
 Se codifica el mensaje a UTF-8, se cifra con AES-CBC y se añade
 automáticamente un tag de autenticación con HMAC.
 '''
-mensaje_cifrado = fernet.encrypt(mensaje_original.encode())
-print(f"Mensaje cifrado: {mensaje_cifrado}")
+def cifrar_mensaje(clave, mensaje):
+    return _fernet.Fernet(clave).encrypt(mensaje.encode())
 
 # --- 4. Descifrar el mensaje ---
 '''
@@ -54,34 +49,64 @@ El método decrypt() recibe los datos cifrados y:
    2. Descifra con la clave AES correspondiente.
 Finalmente convertimos de bytes a string (UTF-8).
 '''
-mensaje_descifrado = fernet.decrypt(mensaje_cifrado).decode()
-print(f"Mensaje descifrado: {mensaje_descifrado}")
+def descifrar_mensaje(clave, mensaje_cifrado):
+    return _fernet.Fernet(clave).decrypt(mensaje_cifrado).decode()
 
 # --- 5. Cifrado y descifrado de un archivo ---
 '''
 A continuación se aplica el mismo procedimiento pero sobre
 un archivo completo en lugar de un mensaje de texto.
 '''
-# Crear archivo de prueba
-with open("secreto.txt", "w", encoding="utf-8") as f:
-    f.write("Este archivo contiene información confidencial.\n")
-
-# Leer y cifrar contenido del archivo en modo binario
-with open("secreto.txt", "rb") as f:
-    datos = f.read()
-datos_cifrados = fernet.encrypt(datos)
-
-# Guardar el archivo cifrado con extensión .encrypted
-with open("secreto.encrypted", "wb") as f:
-    f.write(datos_cifrados)
-print("\nArchivo cifrado creado: secreto.encrypted")
-
-# Leer archivo cifrado en modo binario y luego descifrarlo
-with open("secreto.encrypted", "rb") as f:
-    datos_leidos = f.read()
-datos_descifrados = fernet.decrypt(datos_leidos)
-
-# Guardar el archivo descifrado como una nueva copia
-with open("secreto.decrypted.txt", "wb") as f:
-    f.write(datos_descifrados)
-print("Archivo descifrado creado: secreto.decrypted.txt")
\ No newline at end of file
+def cifrar_archivo(clave, ruta_entrada, ruta_salida):
+    # Leer y cifrar contenido del archivo en modo binario
+    with open(ruta_entrada, "rb") as f:
+        datos = f.read()
+    datos_cifrados = _fernet.Fernet(clave).encrypt(datos)
+
+    # Guardar el archivo cifrado
+    with open(ruta_salida, "wb") as f:
+        f.write(datos_cifrados)
+
+def descifrar_archivo(clave, ruta_entrada, ruta_salida):
+    # Leer archivo cifrado en modo binario y luego descifrarlo
+    with open(ruta_entrada, "rb") as f:
+        datos_leidos = f.read()
+    datos_descifrados = _fernet.Fernet(clave).decrypt(datos_leidos)
+
+    # Guardar el archivo descifrado como una nueva copia
+    with open(ruta_salida, "wb") as f:
+        f.write(datos_descifrados)
+
+
+if __name__ == "__main__":
+    # --- 1. Generar una clave secreta ---
+    clave = generar_clave()
+    print(f"Clave generada: {clave.decode()}")
+
+    # --- 2. Definir un mensaje secreto ---
+    '''
+    Este es el texto en claro que deseamos proteger.
+    '''
+    mensaje_original = "Este es un mensaje confidencial de Guillermo y Daniel"
+    print(f"\nMensaje original: {mensaje_original}")
+
+    # --- 3. Cifrar el mensaje ---
+    mensaje_cifrado = cifrar_mensaje(clave, mensaje_original)
+    print(f"Mensaje cifrado: {mensaje_cifrado}")
+
+    # --- 4. Descifrar el mensaje ---
+    mensaje_descifrado = descifrar_mensaje(clave, mensaje_cifrado)
+    print(f"Mensaje descifrado: {mensaje_descifrado}")
+
+    # --- 5. Cifrado y descifrado de un archivo ---
+    # Crear archivo de prueba
+    with open("secreto.txt", "w", encoding="utf-8") as f:
+        f.write("Este archivo contiene información confidencial.\n")
+
+    # Cifrar con extensión .encrypted
+    cifrar_archivo(clave, "secreto.txt", "secreto.encrypted")
+    print("\nArchivo cifrado creado: secreto.encrypted")
+
+    # Descifrar y guardar como una nueva copia
+    descifrar_archivo(clave, "secreto.encrypted", "secreto.decrypted.txt")
+    print("Archivo descifrado creado: secreto.decrypted.txt")
@@ -5,6 +5,8 @@
 import hashlib
 import hmac
 
+from seguridad.metricas import instrumentar
+
 '''
 Este programa implementa:
    1. Uso de hashlib para calcular el hash SHA-256 de textos y archivos,
@@ -31,6 +33,7 @@ def hash_sha256(data):
     Retorna un str hash en representación hexadecimal de 64 caracteres.
     '''
 
+@instrumentar
 def hash_archivo(ruta):
     """Devuelve el hash SHA-256 de un archivo"""
     h = hashlib.sha256()
@@ -71,6 +74,7 @@ def archivos_identicos(archivo1, archivo2):
 
 
 # --- 3. Generación y verificación de HMAC ---
+@instrumentar
 def generar_hmac(mensaje, clave):
     """Genera HMAC-SHA256 de un mensaje con clave"""
     if isinstance(mensaje, str):
@@ -2,14 +2,21 @@
 # Autores: Guillermo Campo y Daniel Zambrano
 # Universidad Militar Nueva Granada
 
+import base64
 import json
 import secrets
 import hashlib
 import hmac
 import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Tuple
 
+from seguridad.metricas import instrumentar
+
 DB_FILENAME = "usuarios_db.json"  # archivo de persistencia (solo demo)
 
 class SistemaAutenticacion:
@@ -18,17 +25,31 @@ class SistemaAutenticacion:
     - Registra usuarios almacenando (sal, hash) en un JSON.
     - Autentica calculando hash = PBKDF2-HMAC-SHA256(sal, contraseña, iteraciones).
     - Usa comparaciones seguras y sales únicas por usuario.
+    - Opcionalmente emite tokens de sesión firmados (HMAC-SHA256) que se
+      validan sin repetir PBKDF2 ni tocar disco.
     """
-    def __init__(self, db_path: str = DB_FILENAME):
+    def __init__(self, db_path: str = DB_FILENAME, ttl_sesion_s: int = 3600,
+                 max_revocados: int = 10_000, claves_retenidas: int = 1):
         self.db_path = db_path
         # cargar usuarios desde archivo (si existe)
         self.usuarios = self._cargar_usuarios()
+        # sesiones: claves de firma en memoria (id -> clave) y lista negra (id_token -> expira)
+        self.ttl_sesion_s = ttl_sesion_s
+        self.max_revocados = max_revocados
+        self.claves_retenidas = claves_retenidas
+        self._claves_sesion = OrderedDict()
+        self._contador_claves = 0
+        self._id_clave_activa = None
+        self._revocados = OrderedDict()
+        self.invalidaciones_globales = 0
+        self.rotar_clave_sesion()
 
     # ---------- Funciones Criptográficas ----------
     def _generar_sal(self, n_bytes: int = 16) -> bytes:
         """Genera una sal criptográficamente segura (en bytes)."""
         return secrets.token_bytes(n_bytes)
 
+    @instrumentar
     def _hash_password(self, password: str, sal: bytes, iterations: int = 100_000) -> bytes:
         """
         Deriva un hash de la contraseña usando PBKDF2-HMAC-SHA256.
@@ -39,6 +60,7 @@ class SistemaAutenticacion:
         return hashlib.pbkdf2_hmac('sha256', password_bytes, sal, iterations)
 
     # ---------- Persistencia ----------
+    @instrumentar
     def _guardar_usuarios(self) -> None:
         """Guarda la estructura self.usuarios en JSON (sales y hashes en hex)."""
         serializable = {}
@@ -94,12 +116,14 @@ class SistemaAutenticacion:
         self._guardar_usuarios()
         return True, "Usuario registrado exitosamente"
 
-    def iniciar_sesion(self, username: str, password: str) -> Tuple[bool, str]:
+    def iniciar_sesion(self, username: str, password: str, emitir_token: bool = False) -> Tuple[bool, str]:
         """
         Intenta autenticar:
         - Recupera sal almacenada
         - Calcula hash de la contraseña proporcionada con la misma sal
         - Compara con hash almacenado usando hmac.compare_digest (seguro contra timing)
+        - Con emitir_token=True, si es correcto, el mensaje devuelto es un token
+          de sesión (ver validar_sesion)
         """
         usuario = self.usuarios.get(username)
         if usuario is None:
@@ -113,12 +137,118 @@ class SistemaAutenticacion:
         if hmac.compare_digest(intento_hash, esperado):
             usuario['intentos_fallidos'] = 0
             self._guardar_usuarios()
+            if emitir_token:
+                return True, self.emitir_token(username)
             return True, "Inicio de sesion exitoso"
         else:
             usuario['intentos_fallidos'] = usuario.get('intentos_fallidos', 0) + 1
             self._guardar_usuarios()
             return False, f"Contrasena incorrecta (intento {usuario['intentos_fallidos']})"
 
+    # ---------- Sesiones (tokens firmados con HMAC) ----------
+    '''
+    Tras un login correcto se puede emitir un token de sesión para que las
+    peticiones siguientes no repitan PBKDF2:
+
+        <id_clave>.<usuario_b64>.<expira>.<id_token>.<firma_b64>
+
+    firma = HMAC-SHA256(clave_de_sesion[id_clave], todo lo anterior al último ".").
+    validar_sesion() solo recalcula ese HMAC y consulta diccionarios en memoria
+    (microsegundos, sin disco). Las claves de sesión viven solo en memoria: al
+    reiniciar el proceso todos los tokens dejan de ser válidos.
+    - Rotación: rotar_clave_sesion() firma los nuevos tokens con una clave
+      nueva y conserva las 'claves_retenidas' anteriores para validar los
+      tokens ya emitidos; los firmados con claves más antiguas se rechazan.
+    - Revocación: revocar_sesion() anota el id_token en una lista negra en
+      memoria de tamaño máximo 'max_revocados'. Las entradas caducadas se
+      purgan primero; si aun así está llena, descartar una volvería a dar por
+      bueno un token revocado, así que se falla de forma segura: se cambia la
+      clave de sesión sin retener ninguna anterior (todos los tokens emitidos
+      dejan de valer y hay que volver a iniciar sesión) y se vacía la lista.
+      'invalidaciones_globales' cuenta cuántas veces ha ocurrido.
+    '''
+    def _b64(self, datos: bytes) -> str:
+        return base64.urlsafe_b64encode(datos).rstrip(b"=").decode('ascii')
+
+    def _de_b64(self, texto: str) -> bytes:
+        return base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+
+    def rotar_clave_sesion(self) -> str:
+        """Genera una nueva clave de firma de sesiones y la deja activa. Devuelve su id."""
+        self._contador_claves += 1
+        id_clave = str(self._contador_claves)
+        self._claves_sesion[id_clave] = secrets.token_bytes(32)
+        self._id_clave_activa = id_clave
+        while len(self._claves_sesion) > self.claves_retenidas + 1:
+            self._claves_sesion.popitem(last=False)
+        return id_clave
+
+    def emitir_token(self, username: str) -> str:
+        """Emite un token de sesión firmado para 'username' con caducidad ttl_sesion_s."""
+        expira = int(time.time()) + self.ttl_sesion_s
+        mensaje = (f"{self._id_clave_activa}.{self._b64(username.encode('utf-8'))}"
+                   f".{expira}.{secrets.token_urlsafe(12)}")
+        firma = hmac.digest(self._claves_sesion[self._id_clave_activa], mensaje.encode('ascii'), 'sha256')
+        return f"{mensaje}.{self._b64(firma)}"
+
+    def _leer_token(self, token: str):
+        """Comprueba firma y formato. Devuelve (usuario, expira, id_token) o None."""
+        if not isinstance(token, str):
+            return None
+        try:
+            mensaje, firma = token.rsplit(".", 1)
+            id_clave, usuario_b64, expira, id_token = mensaje.split(".")
+            clave = self._claves_sesion.get(id_clave)
+            if clave is None:
+                return None
+            esperada = hmac.digest(clave, mensaje.encode('ascii'), 'sha256')
+            if not hmac.compare_digest(esperada, self._de_b64(firma)):
+                return None
+            return self._de_b64(usuario_b64).decode('utf-8'), int(expira), id_token
+        except (ValueError, UnicodeError):
+            return None
+
+    def validar_sesion(self, token: str) -> Tuple[bool, str]:
+        """
+        Valida un token de sesión sin tocar disco:
+        - firma HMAC con una clave de sesión vigente (comparación segura),
+        - no caducado, no revocado y el usuario sigue existiendo.
+        Retorna (True, username) o (False, motivo).
+        """
+        datos = self._leer_token(token)
+        if datos is None:
+            return False, "Token invalido"
+        usuario, expira, id_token = datos
+        if expira <= time.time():
+            return False, "Token caducado"
+        if id_token in self._revocados:
+            return False, "Token revocado"
+        if usuario not in self.usuarios:
+            return False, "Usuario no encontrado"
+        return True, usuario
+
+    def revocar_sesion(self, token: str) -> bool:
+        """Añade el token a la lista negra hasta que caduque. Retorna False si no es un token válido."""
+        datos = self._leer_token(token)
+        if datos is None:
+            return False
+        _, expira, id_token = datos
+        if len(self._revocados) >= self.max_revocados:
+            ahora = time.time()
+            for caducado in [t for t, exp in self._revocados.items() if exp <= ahora]:
+                del self._revocados[caducado]
+            if len(self._revocados) >= self.max_revocados:
+                # Lista llena de tokens vigentes: invalidar TODOS los tokens
+                # (nueva clave, sin retener las anteriores) en vez de olvidar
+                # una revocación. El token recibido también deja de valer.
+                self._claves_sesion.clear()
+                self.rotar_clave_sesion()
+                self._revocados.clear()
+                self.invalidaciones_globales += 1
+                return True
+        self._revocados[id_token] = expira
+        return True
+
     def mostrar_usuario(self, username: str) -> dict:
         """Devuelve información no sensible del usuario para demostración (sal y hash truncados)."""
         u = self.usuarios.get(username)
@@ -133,10 +263,45 @@ class SistemaAutenticacion:
         }
 
 
+def prueba_de_carga(segundos: float = 2.0) -> dict:
+    """
+    Peticiones autenticadas por segundo (un solo hilo) con dos estrategias:
+    - 'password': cada petición llama a iniciar_sesion (PBKDF2 + guardar JSON).
+    - 'token': login una vez con emitir_token=True y cada petición llama a validar_sesion.
+    Usa una base de datos temporal.
+    """
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        sistema = SistemaAutenticacion(os.path.join(directorio, "usuarios_carga.json"))
+        sistema.registrar_usuario("carga", "ClaveDeCarga123!")
+        _, token = sistema.iniciar_sesion("carga", "ClaveDeCarga123!", emitir_token=True)
+
+        for modo, peticion in (("password", lambda: sistema.iniciar_sesion("carga", "ClaveDeCarga123!")),
+                               ("token", lambda: sistema.validar_sesion(token))):
+            n, inicio = 0, time.perf_counter()
+            while time.perf_counter() - inicio < segundos:
+                ok, _ = peticion()
+                if not ok:
+                    raise RuntimeError(f"Fallo de autenticacion en modo {modo}")
+                n += 1
+            transcurrido = time.perf_counter() - inicio
+            resultados[modo] = {"peticiones_s": n / transcurrido, "latencia_us": transcurrido / n * 1e6}
+    resultados["aceleracion"] = resultados["token"]["peticiones_s"] / resultados["password"]["peticiones_s"]
+    return resultados
+
+
 # ============================================================
 # Programa principal: Demostración
 # ============================================================
-if __name__ == "__main__":
+if __name__ == "__main__" and "--carga" in sys.argv:
+    # Uso: python 3_Hash_Sal.py --carga [segundos]
+    argumentos = [a for a in sys.argv[1:] if a != "--carga"]
+    r = prueba_de_carga(float(argumentos[0]) if argumentos else 2.0)
+    for modo in ("password", "token"):
+        print(f"{modo:<9} {r[modo]['peticiones_s']:>12,.0f} peticiones/s  ({r[modo]['latencia_us']:,.1f} us/peticion)")
+    print(f"Aceleracion con tokens: x{r['aceleracion']:,.0f}")
+
+elif __name__ == "__main__":
 
     print("AUTENTICACION CON HASH Y SAL")
     sistema = SistemaAutenticacion()
@@ -160,6 +325,17 @@ if __name__ == "__main__":
         ok, msg = sistema.iniciar_sesion(user, pwd)
         print(f"Login {user} (incorrecto): {msg}")
 
+    # Sesiones con token firmado: login una vez, después se valida el token
+    print("\nSesiones con token:")
+    ok, token = sistema.iniciar_sesion("guillermo", "MiClave123!", emitir_token=True)
+    print(f"Token emitido: {token[:40]}...")
+    print(f"Validar token: {sistema.validar_sesion(token)}")
+    print(f"Validar token alterado: {sistema.validar_sesion(token[:-2] + 'AA')}")
+    sistema.rotar_clave_sesion()
+    print(f"Validar tras rotar la clave: {sistema.validar_sesion(token)}")
+    sistema.revocar_sesion(token)
+    print(f"Validar tras revocar: {sistema.validar_sesion(token)}")
+
     # Limpieza (archivo temporario)
     try:
         os.remove(DB_FILENAME)
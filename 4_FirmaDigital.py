@@ -2,81 +2,396 @@
 # Autores: Guillermo Campo y Daniel Zambrano
 # Universidad Militar Nueva Granada
 
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
-from cryptography.hazmat.primitives import hashes
-from cryptography.exceptions import InvalidSignature
-
-# ==============================
-# 1. GENERACIÓN DE PAR DE CLAVES
-# ==============================
-
-# Se genera una clave privada RSA de 2048 bits
-clave_privada = rsa.generate_private_key(
-    public_exponent=65537,   # Exponente público estándar
-    key_size=2048            # Longitud de clave (segura y comúnmente usada)
-)
-
-# A partir de la privada, se deriva la clave pública
-clave_publica = clave_privada.public_key()
-
-print("Par de claves RSA generado exitosamente")
-
-# ==============================
-# 2. FIRMA DE UN MENSAJE
-# ==============================
-
-mensaje = "Este es un mensaje importante para firmar."
-print(f"\nMensaje original:\n{mensaje}")
-
-# La firma se genera con la clave privada usando PSS + SHA-256
-firma = clave_privada.sign(
-    mensaje.encode(),  # Convertimos el mensaje a bytes
-    padding.PSS(
-        mgf=padding.MGF1(hashes.SHA256()),   # Generador de máscara
-        salt_length=padding.PSS.MAX_LENGTH   # Longitud máxima de sal
-    ),
-    hashes.SHA256()  # Algoritmo de hash
-)
-
-print(f"Mensaje firmado")
-print(f"Firma (bytes): {firma[:20]}... ({len(firma)} bytes)")
-
-# ==============================
-# 3. VERIFICACIÓN DE LA FIRMA
-# ==============================
-
-try:
-    clave_publica.verify(
-        firma,
-        mensaje.encode(),
-        padding.PSS(
-            mgf=padding.MGF1(hashes.SHA256()),
-            salt_length=padding.PSS.MAX_LENGTH
-        ),
-        hashes.SHA256()
-    )
-    print("Verificacion exitosa: La firma es VALIDA")
-except InvalidSignature:
-    print("La firma es INVALIDA")
-
-# ==============================
-# 4. PRUEBA CON MENSAJE ALTERADO
-# ==============================
-
-mensaje_modificado = mensaje.replace("importante", "alterado")
-print(f"\nMensaje modificado:\n{mensaje_modificado}")
-
-# Intentamos verificar la firma original con el mensaje cambiado
-try:
-    clave_publica.verify(
-        firma,
-        mensaje_modificado.encode(),
-        padding.PSS(
-            mgf=padding.MGF1(hashes.SHA256()),
-            salt_length=padding.PSS.MAX_LENGTH
-        ),
-        hashes.SHA256()
+import hashlib
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from seguridad import importar_perezoso
+
+# cryptography se carga en el primer uso (importar este módulo es inmediato)
+rsa = importar_perezoso("cryptography.hazmat.primitives.asymmetric.rsa")
+padding = importar_perezoso("cryptography.hazmat.primitives.asymmetric.padding")
+ec = importar_perezoso("cryptography.hazmat.primitives.asymmetric.ec")
+ed25519 = importar_perezoso("cryptography.hazmat.primitives.asymmetric.ed25519")
+utils = importar_perezoso("cryptography.hazmat.primitives.asymmetric.utils")
+hashes = importar_perezoso("cryptography.hazmat.primitives.hashes")
+serialization = importar_perezoso("cryptography.hazmat.primitives.serialization")
+exceptions = importar_perezoso("cryptography.exceptions")
+
+'''
+ ALGORITMOS DE FIRMA SOPORTADOS
+ ================================================================
+ Todas las funciones reciben el nombre del algoritmo como parámetro:
+   - "rsa-pss":    RSA 2048 bits con relleno PSS + SHA-256 (el original).
+   - "ecdsa-p256": ECDSA sobre la curva P-256 con SHA-256.
+   - "ed25519":    EdDSA sobre Curve25519 (firmas de 64 bytes, muy rápido).
+ Las tres comparten la misma interfaz: generar_par_claves / firmar /
+ verificar_firma, de modo que cambiar de algoritmo es cambiar un string.
+================================================================
+'''
+
+ALGORITMO_POR_DEFECTO = "rsa-pss"
+ALGORITMOS_FIRMA = ("rsa-pss", "ecdsa-p256", "ed25519")
+
+
+def _parametros_firma(algoritmo):
+    """
+    Devuelve los argumentos extra que sign()/verify() necesitan según el algoritmo
+    (relleno y hash para RSA, esquema para ECDSA, ninguno para Ed25519).
+    """
+    if algoritmo == "rsa-pss":
+        return (
+            padding.PSS(
+                mgf=padding.MGF1(hashes.SHA256()),   # Generador de máscara
+                salt_length=padding.PSS.MAX_LENGTH   # Longitud máxima de sal
+            ),
+            hashes.SHA256()  # Algoritmo de hash
+        )
+    if algoritmo == "ecdsa-p256":
+        return (ec.ECDSA(hashes.SHA256()),)
+    if algoritmo == "ed25519":
+        return ()
+    raise ValueError(f"Algoritmo de firma no soportado: {algoritmo!r} (use uno de {ALGORITMOS_FIRMA})")
+
+
+def generar_par_claves(algoritmo=ALGORITMO_POR_DEFECTO):
+    """
+    Genera un par (clave_privada, clave_publica) para el algoritmo indicado.
+    """
+    if algoritmo == "rsa-pss":
+        clave_privada = rsa.generate_private_key(
+            public_exponent=65537,   # Exponente público estándar
+            key_size=2048            # Longitud de clave (segura y comúnmente usada)
+        )
+    elif algoritmo == "ecdsa-p256":
+        clave_privada = ec.generate_private_key(ec.SECP256R1())
+    elif algoritmo == "ed25519":
+        clave_privada = ed25519.Ed25519PrivateKey.generate()
+    else:
+        _parametros_firma(algoritmo)  # lanza ValueError con el mensaje estándar
+    # A partir de la privada, se deriva la clave pública
+    return clave_privada, clave_privada.public_key()
+
+
+def firmar(clave_privada, mensaje, algoritmo=ALGORITMO_POR_DEFECTO):
+    """
+    Firma 'mensaje' (str o bytes) con la clave privada y devuelve la firma en bytes.
+    """
+    if isinstance(mensaje, str):
+        mensaje = mensaje.encode()
+    return clave_privada.sign(mensaje, *_parametros_firma(algoritmo))
+
+
+def verificar_firma(clave_publica, firma, mensaje, algoritmo=ALGORITMO_POR_DEFECTO):
+    """
+    Verifica la firma de 'mensaje' con la clave pública.
+    Retorna True si es válida y False si la firma no corresponde (InvalidSignature).
+    """
+    if isinstance(mensaje, str):
+        mensaje = mensaje.encode()
+    try:
+        clave_publica.verify(firma, mensaje, *_parametros_firma(algoritmo))
+        return True
+    except exceptions.InvalidSignature:
+        return False
+
+
+'''
+ FIRMA DE ARCHIVOS GRANDES (STREAMING)
+ ================================================================
+ sign(mensaje, ...) necesita todo el mensaje en memoria. Para archivos
+ grandes se calcula el SHA-256 por bloques y se firma solo el resumen con
+ utils.Prehashed: la firma resultante es la misma que se obtendría firmando
+ el archivo completo, pero la memoria usada es constante.
+ Ed25519 (puro) no admite resúmenes precalculados, por eso aquí solo se
+ aceptan "rsa-pss" y "ecdsa-p256".
+================================================================
+'''
+
+TAMANO_BLOQUE_ARCHIVO = 1024 * 1024  # 1 MiB por lectura
+
+
+def _parametros_firma_prehash(algoritmo):
+    """Igual que _parametros_firma pero indicando que el dato ya es un resumen SHA-256."""
+    if algoritmo == "rsa-pss":
+        return (
+            padding.PSS(
+                mgf=padding.MGF1(hashes.SHA256()),
+                salt_length=padding.PSS.MAX_LENGTH
+            ),
+            utils.Prehashed(hashes.SHA256())
+        )
+    if algoritmo == "ecdsa-p256":
+        return (ec.ECDSA(utils.Prehashed(hashes.SHA256())),)
+    if algoritmo == "ed25519":
+        raise ValueError("Ed25519 no admite firmas sobre resumen precalculado; use rsa-pss o ecdsa-p256")
+    return _parametros_firma(algoritmo)  # lanza ValueError con el mensaje estándar
+
+
+def digest_archivo(ruta, tamano_bloque=TAMANO_BLOQUE_ARCHIVO):
+    """
+    Calcula el SHA-256 de un archivo leyéndolo por bloques.
+    Un hilo lector va cargando el siguiente bloque mientras el hilo principal
+    calcula el hash del actual (hashlib libera el GIL en bloques grandes),
+    así la lectura de disco y el cálculo se solapan.
+    """
+    cola = queue.Queue(maxsize=2)  # como mucho dos bloques en memoria
+
+    def lector():
+        try:
+            with open(ruta, 'rb') as f:
+                for bloque in iter(lambda: f.read(tamano_bloque), b""):
+                    cola.put(bloque)
+        except Exception as e:
+            cola.put(e)
+            return
+        cola.put(None)  # fin de archivo
+
+    hilo = threading.Thread(target=lector, daemon=True)
+    hilo.start()
+    h = hashlib.sha256()
+    while True:
+        bloque = cola.get()
+        if bloque is None:
+            break
+        if isinstance(bloque, Exception):
+            raise bloque
+        h.update(bloque)
+    hilo.join()
+    return h.digest()
+
+
+def firmar_archivo(clave_privada, ruta, algoritmo=ALGORITMO_POR_DEFECTO, ruta_firma=None):
+    """
+    Firma un archivo de cualquier tamaño y guarda la firma separada en
+    'ruta_firma' (por defecto ruta + ".sig"). Devuelve la ruta de la firma.
+    """
+    parametros = _parametros_firma_prehash(algoritmo)
+    firma = clave_privada.sign(digest_archivo(ruta), *parametros)
+    ruta_firma = ruta_firma or ruta + ".sig"
+    with open(ruta_firma, 'wb') as f:
+        f.write(firma)
+    return ruta_firma
+
+
+def verificar_archivo(clave_publica, ruta, algoritmo=ALGORITMO_POR_DEFECTO, ruta_firma=None):
+    """
+    Verifica la firma separada de un archivo usando el mismo cálculo por bloques.
+    Retorna True si la firma es válida y False en caso contrario.
+    """
+    parametros = _parametros_firma_prehash(algoritmo)
+    with open(ruta_firma or ruta + ".sig", 'rb') as f:
+        firma = f.read()
+    try:
+        clave_publica.verify(firma, digest_archivo(ruta), *parametros)
+        return True
+    except exceptions.InvalidSignature:
+        return False
+
+
+'''
+ CACHÉ DE VERIFICACIONES
+ ================================================================
+ Verificar la misma firma una y otra vez repite la operación de clave
+ pública. VerificadorCacheado recuerda SOLO los resultados positivos en un
+ LRU acotado, con clave (huella de la clave pública, SHA-256 del mensaje,
+ SHA-256 de la firma). Un resultado negativo nunca se guarda: una firma
+ inválida siempre se vuelve a comprobar.
+================================================================
+'''
+
+def huella_clave_publica(clave_publica):
+    """SHA-256 de la clave pública en formato DER (SubjectPublicKeyInfo)."""
+    der = clave_publica.public_bytes(
+        serialization.Encoding.DER,
+        serialization.PublicFormat.SubjectPublicKeyInfo
     )
-    print("ERROR: La firma fue aceptada para un mensaje alterado")
-except InvalidSignature:
-    print("Correcto: La firma NO es valida si el mensaje fue modificado")
\ No newline at end of file
+    return hashlib.sha256(der).digest()
+
+
+class VerificadorCacheado:
+    """
+    Envoltorio de verificar_firma con caché LRU de verificaciones exitosas.
+    - max_entradas: número máximo de resultados guardados (se descarta el menos usado).
+    - ttl_s: segundos que un resultado sigue siendo válido (None = sin caducidad).
+    estadisticas() informa aciertos/fallos y el tiempo de CPU estimado que se ahorró.
+    """
+    def __init__(self, max_entradas: int = 10_000, ttl_s: float = 300.0):
+        self.max_entradas = max_entradas
+        self.ttl_s = ttl_s
+        self._cache = OrderedDict()  # clave -> instante de inserción
+        self._huellas = {}           # id(clave_publica) -> (clave_publica, huella)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expirados = 0
+        self._tiempo_verificacion = 0.0  # segundos gastados en verificaciones reales
+        self._verificaciones = 0
+
+    def _huella(self, clave_publica) -> bytes:
+        """Huella de la clave, memorizada por objeto para no serializarla en cada llamada."""
+        entrada = self._huellas.get(id(clave_publica))
+        if entrada is None or entrada[0] is not clave_publica:
+            entrada = (clave_publica, huella_clave_publica(clave_publica))
+            if len(self._huellas) >= self.max_entradas:
+                self._huellas.clear()  # acotado igual que la caché principal
+            self._huellas[id(clave_publica)] = entrada
+        return entrada[1]
+
+    def verificar(self, clave_publica, firma, mensaje, algoritmo=ALGORITMO_POR_DEFECTO) -> bool:
+        """Mismo contrato que verificar_firma, consultando antes la caché."""
+        if isinstance(mensaje, str):
+            mensaje = mensaje.encode()
+        clave = (
+            self._huella(clave_publica),
+            hashlib.sha256(mensaje).digest(),
+            hashlib.sha256(firma).digest(),
+            algoritmo,
+        )
+        ahora = time.monotonic()
+        with self._lock:
+            insertado = self._cache.get(clave)
+            if insertado is not None:
+                if self.ttl_s is None or ahora - insertado <= self.ttl_s:
+                    self._cache.move_to_end(clave)
+                    self.aciertos += 1
+                    return True
+                del self._cache[clave]
+                self.expirados += 1
+            self.fallos += 1
+
+        inicio = time.perf_counter()
+        valida = verificar_firma(clave_publica, firma, mensaje, algoritmo)
+        duracion = time.perf_counter() - inicio
+
+        with self._lock:
+            self._tiempo_verificacion += duracion
+            self._verificaciones += 1
+            if valida:
+                self._cache[clave] = ahora
+                self._cache.move_to_end(clave)
+                while len(self._cache) > self.max_entradas:
+                    self._cache.popitem(last=False)
+        return valida
+
+    def limpiar(self) -> None:
+        """Vacía la caché (por ejemplo, tras revocar una clave)."""
+        with self._lock:
+            self._cache.clear()
+            self._huellas.clear()
+
+    def estadisticas(self) -> dict:
+        """Contadores de la caché y CPU ahorrada estimada (aciertos x tiempo medio de verificación)."""
+        with self._lock:
+            total = self.aciertos + self.fallos
+            medio = self._tiempo_verificacion / self._verificaciones if self._verificaciones else 0.0
+            return {
+                "entradas": len(self._cache),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "expirados": self.expirados,
+                "tasa_aciertos": self.aciertos / total if total else 0.0,
+                "verificacion_media_s": medio,
+                "cpu_ahorrada_s": self.aciertos * medio,
+            }
+
+
+def benchmark_firmas(algoritmos=ALGORITMOS_FIRMA, repeticiones=200, n_claves=5, tamano_mensaje=256):
+    """
+    Mide, para cada algoritmo en este equipo:
+    - tiempo medio de generación de claves (ms)
+    - firmas por segundo y verificaciones por segundo
+    - tamaño de la firma en bytes
+    Devuelve una lista de diccionarios (una fila por algoritmo).
+    """
+    mensaje = b"x" * tamano_mensaje
+    resultados = []
+    for algoritmo in algoritmos:
+        inicio = time.perf_counter()
+        for _ in range(n_claves):
+            clave_privada, clave_publica = generar_par_claves(algoritmo)
+        keygen_ms = (time.perf_counter() - inicio) / n_claves * 1000
+
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            firma = firmar(clave_privada, mensaje, algoritmo)
+        firmas_s = repeticiones / (time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            verificar_firma(clave_publica, firma, mensaje, algoritmo)
+        verificaciones_s = repeticiones / (time.perf_counter() - inicio)
+
+        resultados.append({
+            "algoritmo": algoritmo,
+            "keygen_ms": keygen_ms,
+            "firmas_s": firmas_s,
+            "verificaciones_s": verificaciones_s,
+            "tamano_firma": len(firma),
+        })
+    return resultados
+
+
+def imprimir_benchmark(resultados):
+    """Imprime la tabla de resultados de benchmark_firmas()."""
+    print(f"{'Algoritmo':<12} {'Keygen (ms)':>12} {'Firmas/s':>10} {'Verif./s':>10} {'Firma (B)':>10}")
+    for r in resultados:
+        print(f"{r['algoritmo']:<12} {r['keygen_ms']:>12.2f} {r['firmas_s']:>10.0f} "
+              f"{r['verificaciones_s']:>10.0f} {r['tamano_firma']:>10}")
+
+
+if __name__ == "__main__":
+    # ==============================
+    # 1. GENERACIÓN DE PAR DE CLAVES
+    # ==============================
+
+    # Se genera una clave privada RSA de 2048 bits y se deriva la pública
+    clave_privada, clave_publica = generar_par_claves("rsa-pss")
+
+    print("Par de claves RSA generado exitosamente")
+
+    # ==============================
+    # 2. FIRMA DE UN MENSAJE
+    # ==============================
+
+    mensaje = "Este es un mensaje importante para firmar."
+    print(f"\nMensaje original:\n{mensaje}")
+
+    # La firma se genera con la clave privada usando PSS + SHA-256
+    firma = firmar(clave_privada, mensaje, "rsa-pss")
+
+    print(f"Mensaje firmado")
+    print(f"Firma (bytes): {firma[:20]}... ({len(firma)} bytes)")
+
+    # ==============================
+    # 3. VERIFICACIÓN DE LA FIRMA
+    # ==============================
+
+    if verificar_firma(clave_publica, firma, mensaje, "rsa-pss"):
+        print("Verificacion exitosa: La firma es VALIDA")
+    else:
+        print("La firma es INVALIDA")
+
+    # ==============================
+    # 4. PRUEBA CON MENSAJE ALTERADO
+    # ==============================
+
+    mensaje_modificado = mensaje.replace("importante", "alterado")
+    print(f"\nMensaje modificado:\n{mensaje_modificado}")
+
+    # Intentamos verificar la firma original con el mensaje cambiado
+    if verificar_firma(clave_publica, firma, mensaje_modificado, "rsa-pss"):
+        print("ERROR: La firma fue aceptada para un mensaje alterado")
+    else:
+        print("Correcto: La firma NO es valida si el mensaje fue modificado")
+
+    # ==============================
+    # 5. COMPARATIVA DE ALGORITMOS (opcional: python 4_FirmaDigital.py --bench)
+    # ==============================
+
+    if "--bench" in sys.argv:
+        print("\nBenchmark de algoritmos de firma en este equipo:")
+        imprimir_benchmark(benchmark_firmas())
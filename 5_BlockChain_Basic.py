@@ -2,11 +2,462 @@
 # Autores: Guillermo Campo y Daniel Zambrano
 # Universidad Militar Nueva Granada
 
+import functools
+import gc
 import hashlib
+import hmac
+import json
+import mmap
+import multiprocessing
+import os
+import queue
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from array import array
 from datetime import datetime
 
-class Bloque:
-    def __init__(self, indice, datos, hash_anterior):
+from seguridad.metricas import instrumentar
+
+DIGEST_CERO = bytes(32)  # "hash_anterior" del bloque génesis
+
+
+def _a_digest(valor):
+    """
+    Convierte un hash recibido como hex (str) o como 32 bytes a bytes crudos.
+    El "0" histórico del bloque génesis equivale a 32 bytes en cero.
+    """
+    if isinstance(valor, (bytes, bytearray, memoryview)):
+        valor = bytes(valor)
+        if len(valor) != 32:
+            raise ValueError("Un digest SHA-256 debe tener 32 bytes")
+        return valor
+    if valor.strip("0") == "":
+        return DIGEST_CERO
+    return bytes.fromhex(valor)
+
+
+# ===============================
+# ÁRBOL DE MERKLE (bloques con varias transacciones)
+# ===============================
+'''
+ Cuando 'datos' es una lista de transacciones, el bloque no se compromete con
+ los datos serializados sino con la raíz de un árbol de Merkle:
+   - hoja    = SHA-256(0x00 || transacción serializada)
+   - nodo    = SHA-256(0x01 || hijo_izquierdo || hijo_derecho)
+   - si un nivel tiene un número impar de nodos, el último sube sin cambios.
+ Los prefijos 0x00/0x01 impiden hacer pasar un nodo interno por una hoja.
+ Para probar que una transacción está en el bloque basta con la cabecera y
+ log2(n) hashes hermanos (prueba de inclusión), sin descargar el bloque entero.
+'''
+
+def serializar_transaccion(transaccion):
+    """
+    Serialización determinista de una transacción (JSON con claves ordenadas,
+    sin espacios, UTF-8): la misma transacción produce siempre los mismos bytes.
+    """
+    return json.dumps(transaccion, sort_keys=True, separators=(",", ":"),
+                      ensure_ascii=False).encode('utf-8')
+
+
+def _hash_hoja(transaccion):
+    return hashlib.sha256(b"\x00" + serializar_transaccion(transaccion)).digest()
+
+
+def _hash_nodo(izquierdo, derecho):
+    return hashlib.sha256(b"\x01" + izquierdo + derecho).digest()
+
+
+def _siguiente_nivel(nivel):
+    """Combina los nodos de dos en dos; un nodo impar al final sube tal cual."""
+    siguiente = [_hash_nodo(nivel[i], nivel[i + 1]) for i in range(0, len(nivel) - 1, 2)]
+    if len(nivel) % 2:
+        siguiente.append(nivel[-1])
+    return siguiente
+
+
+def raiz_merkle(transacciones):
+    """Raíz de Merkle (32 bytes) de una lista de transacciones."""
+    if not transacciones:
+        return hashlib.sha256(b"").digest()
+    nivel = [_hash_hoja(t) for t in transacciones]
+    while len(nivel) > 1:
+        nivel = _siguiente_nivel(nivel)
+    return nivel[0]
+
+
+def prueba_inclusion(transacciones, posicion):
+    """
+    Prueba de inclusión de transacciones[posicion]: lista de pares
+    (lado, hash_hermano) desde la hoja hasta la raíz, donde lado es "I" si el
+    hermano va a la izquierda y "D" si va a la derecha. Tamaño O(log n).
+    """
+    if not 0 <= posicion < len(transacciones):
+        raise IndexError("posición de transacción fuera de rango")
+    nivel = [_hash_hoja(t) for t in transacciones]
+    prueba = []
+    while len(nivel) > 1:
+        hermano = posicion ^ 1
+        if hermano < len(nivel):  # si no hay hermano, el nodo sube sin combinarse
+            prueba.append(("I" if hermano < posicion else "D", nivel[hermano]))
+        nivel = _siguiente_nivel(nivel)
+        posicion //= 2
+    return prueba
+
+
+def verificar_inclusion(transaccion, prueba, raiz):
+    """True si 'prueba' demuestra que 'transaccion' pertenece al árbol con esa raíz."""
+    actual = _hash_hoja(transaccion)
+    for lado, hermano in prueba:
+        hermano = _a_digest(hermano)  # admite hashes en bytes o en hexadecimal
+        actual = _hash_nodo(hermano, actual) if lado == "I" else _hash_nodo(actual, hermano)
+    return hmac.compare_digest(actual, _a_digest(raiz))
+
+
+def compromiso_datos(datos):
+    """
+    Bytes con los que la cabecera se compromete con el contenido del bloque:
+    la raíz de Merkle si 'datos' es una lista de transacciones, el texto tal
+    cual si es una cadena, y si no su serialización JSON canónica (la misma de
+    serializar_transaccion). Con str(datos) una tupla y la lista que vuelve de
+    disco darían hashes distintos; el JSON canónico es el mismo para ambas.
+    Los valores que no son serializables en JSON (solo admisibles en cadenas
+    en memoria) se comprometen con str(datos).
+    """
+    if isinstance(datos, (list, tuple)):
+        return raiz_merkle(datos)
+    if isinstance(datos, str):
+        return datos.encode()
+    try:
+        return serializar_transaccion(datos)
+    except (TypeError, ValueError):
+        return str(datos).encode()
+
+
+def prefijo_cabecera(indice, timestamp_us, compromiso, digest_anterior, dificultad=0):
+    """
+    Bytes fijos de la cabecera (todo salvo el nonce). En bloques con prueba de
+    trabajo también incluye la dificultad, para que no pueda rebajarse después.
+    """
+    prefijo = (
+        str(indice).encode() +
+        str(timestamp_us).encode() +
+        compromiso +
+        digest_anterior
+    )
+    if dificultad:
+        prefijo += b"pow:" + str(dificultad).encode() + b":"
+    return prefijo
+
+
+def digest_cabecera(indice, timestamp_us, compromiso, digest_anterior, dificultad=0, nonce=0):
+    """
+    Hash SHA-256 (32 bytes) de una cabecera de bloque. Es lo único que necesita
+    un cliente ligero para comprobar que una raíz de Merkle pertenece a un bloque.
+    Sin prueba de trabajo (dificultad 0) el nonce no forma parte de la cabecera.
+    """
+    prefijo = prefijo_cabecera(indice, timestamp_us, compromiso, digest_anterior, dificultad)
+    if dificultad:
+        prefijo += nonce.to_bytes(8, 'little')
+    return hashlib.sha256(prefijo).digest()
+
+
+def verificar_prueba_bloque(prueba):
+    """
+    Verificación de cliente ligero del resultado de Blockchain.prueba_inclusion():
+    comprueba que la transacción está bajo la raíz de Merkle y que esa raíz,
+    junto con el resto de la cabecera, produce el hash del bloque.
+    """
+    cabecera = prueba["cabecera"]
+    raiz = bytes.fromhex(cabecera["raiz_merkle"])
+    digest = digest_cabecera(cabecera["indice"], cabecera["timestamp_us"], raiz,
+                             bytes.fromhex(cabecera["hash_anterior"]),
+                             cabecera.get("dificultad", 0), cabecera.get("nonce", 0))
+    return (digest.hex() == cabecera["hash"]
+            and cumple_dificultad(digest, cabecera.get("dificultad", 0))
+            and verificar_inclusion(prueba["transaccion"], prueba["prueba"], raiz))
+
+
+# ===============================
+# PRUEBA DE TRABAJO (proof-of-work)
+# ===============================
+'''
+ Con dificultad d > 0 un bloque solo es válido si su hash, leído como entero
+ de 256 bits, empieza con d bits en cero. Encontrarlo exige probar nonces:
+   hash = SHA-256(prefijo_cabecera || nonce de 8 bytes)
+ El prefijo no cambia entre intentos, así que se procesa UNA vez y en cada
+ intento solo se copia el estado interno de SHA-256 (hashlib .copy()) y se
+ añade el nonce. La búsqueda se reparte entre procesos: el trabajador k prueba
+ los nonces k, k + p, k + 2p, ... y todos se detienen en cuanto uno acierta.
+'''
+
+LOTE_MINADO = 4096  # intentos entre cada consulta a la señal de parada
+
+
+def cumple_dificultad(digest, dificultad):
+    """True si el digest tiene al menos 'dificultad' bits iniciales en cero."""
+    return dificultad <= 0 or int.from_bytes(digest, 'big') >> (256 - dificultad) == 0
+
+
+def _buscar_nonce(prefijo, dificultad, inicio, paso, parar=None, limite=None):
+    """
+    Prueba nonces inicio, inicio + paso, ... sobre el estado SHA-256 del prefijo.
+    Devuelve (nonce o None, intentos realizados).
+    """
+    base = hashlib.sha256(prefijo)
+    objetivo = 1 << (256 - dificultad)
+    nonce = inicio
+    intentos = 0
+    while (parar is None or not parar.is_set()) and (limite is None or intentos < limite):
+        for _ in range(LOTE_MINADO):
+            h = base.copy()
+            h.update(nonce.to_bytes(8, 'little'))
+            if int.from_bytes(h.digest(), 'big') < objetivo:
+                return nonce, intentos + 1
+            nonce += paso
+            intentos += 1
+    return None, intentos
+
+
+def _trabajador_minado(id_trabajador, prefijo, dificultad, paso, parar, resultados):
+    """Proceso de minado: busca en su franja de nonces y reporta nonce e intentos."""
+    inicio = time.perf_counter()
+    nonce, intentos = _buscar_nonce(prefijo, dificultad, id_trabajador, paso, parar)
+    if nonce is not None:
+        parar.set()  # avisar al resto de trabajadores
+    resultados.put((id_trabajador, nonce, intentos, time.perf_counter() - inicio))
+
+
+def minar_bloque(bloque, procesos=None):
+    """
+    Busca un nonce que cumpla bloque.dificultad, lo guarda en el bloque junto con
+    el nuevo hash y devuelve estadísticas de hashrate (global y por trabajador).
+    procesos=None usa todos los núcleos; procesos=1 mina en el proceso actual.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    prefijo = bloque.prefijo_cabecera()  # se calcula una sola vez por bloque
+    inicio = time.perf_counter()
+    if procesos == 1:
+        nonce, intentos = _buscar_nonce(prefijo, bloque.dificultad, 0, 1)
+        por_trabajador = [(0, nonce, intentos, time.perf_counter() - inicio)]
+    else:
+        parar = multiprocessing.Event()
+        resultados = multiprocessing.Queue()
+        trabajadores = [
+            multiprocessing.Process(target=_trabajador_minado,
+                                    args=(k, prefijo, bloque.dificultad, procesos, parar, resultados))
+            for k in range(procesos)
+        ]
+        for t in trabajadores:
+            t.start()
+        por_trabajador = []
+        while len(por_trabajador) < procesos:
+            try:
+                por_trabajador.append(resultados.get(timeout=0.5))
+            except queue.Empty:
+                # Un trabajador que termina bien siempre deja su resultado en la cola;
+                # si alguno murió (señal, memoria, excepción) no hay que esperarlo más.
+                caidos = [(k, t.exitcode) for k, t in enumerate(trabajadores) if t.exitcode not in (None, 0)]
+                if caidos:
+                    parar.set()
+                    for t in trabajadores:
+                        t.join(timeout=1)
+                        if t.is_alive():
+                            t.terminate()
+                    k, codigo = caidos[0]
+                    raise RuntimeError(f"El trabajador de minado {k} terminó inesperadamente (código {codigo})")
+        for t in trabajadores:
+            t.join()
+        # Si dos trabajadores aciertan casi a la vez, cualquiera de los nonces es válido
+        nonce = min(r[1] for r in por_trabajador if r[1] is not None)
+    segundos = time.perf_counter() - inicio
+
+    bloque.nonce = nonce
+    bloque.digest = bloque.calcular_digest()
+    intentos_totales = sum(r[2] for r in por_trabajador)
+    return {
+        "nonce": nonce,
+        "dificultad": bloque.dificultad,
+        "procesos": procesos,
+        "intentos": intentos_totales,
+        "segundos": segundos,
+        "hashrate": intentos_totales / segundos if segundos else 0.0,
+        "por_trabajador": [
+            {"trabajador": k, "intentos": n, "segundos": s, "hashrate": n / s if s else 0.0}
+            for k, _, n, s in sorted(por_trabajador)
+        ],
+    }
+
+
+# ===============================
+# VALIDACIÓN PARALELA DE LA CADENA COMPLETA
+# ===============================
+'''
+ Recalcular el hash de cada bloque no depende de los demás; solo el enlace
+ hash_anterior une bloques vecinos. Para auditar cadenas grandes se divide la
+ cadena en rangos, cada proceso revisa hashes y enlaces internos de su rango,
+ y el proceso principal comprueba los enlaces en las fronteras entre rangos.
+ Con el método de arranque "fork" los trabajadores heredan la cadena en
+ memoria; con "spawn" se les envían las cabeceras de su rango.
+'''
+
+_CADENA_COMPARTIDA = None  # cadena heredada por los trabajadores (solo con "fork")
+
+
+def _campos_bloque(bloque):
+    """Tupla con los campos necesarios para revisar un bloque (se puede enviar a otro proceso)."""
+    return (bloque.indice, bloque.timestamp_us, bloque.datos, bloque.digest_anterior,
+            bloque.digest, bloque.dificultad, bloque.nonce)
+
+
+def _revisar_rango(inicio, campos, dificultad_minima=0):
+    """
+    Revisa bloques consecutivos que empiezan en la posición 'inicio'.
+    Devuelve la posición del primer bloque inválido (hash, dificultad por debajo
+    de 'dificultad_minima' o no cumplida, o enlace con el bloque anterior del
+    mismo rango) o None si todos son válidos.
+    """
+    anterior = None
+    for i, (indice, timestamp_us, datos, digest_anterior, digest, dificultad, nonce) in enumerate(campos, inicio):
+        if i > 0:  # el bloque génesis no se revisa, igual que en es_cadena_valida
+            calculado = digest_cabecera(indice, timestamp_us, compromiso_datos(datos),
+                                        digest_anterior, dificultad, nonce)
+            if (digest != calculado or dificultad < dificultad_minima
+                    or not cumple_dificultad(digest, dificultad)):
+                return i
+            if anterior is not None and digest_anterior != anterior:
+                return i
+        anterior = digest
+    return None
+
+
+def _revisar_rango_compartido(inicio, fin, dificultad_minima=0):
+    """Versión de _revisar_rango que lee los bloques de la cadena heredada por fork."""
+    cadena = _CADENA_COMPARTIDA
+    return _revisar_rango(inicio, (_campos_bloque(cadena[i]) for i in range(inicio, fin)), dificultad_minima)
+
+
+class _CamposBloque:
+    """
+    Comportamiento común de un bloque, independiente de cómo se almacenen sus campos.
+    Internamente los hashes son 32 bytes crudos (digest / digest_anterior) y el
+    timestamp un entero en microsegundos (timestamp_us); las propiedades hash,
+    hash_anterior y timestamp mantienen la interfaz original en texto.
+    """
+    __slots__ = ()
+
+    @property
+    def hash(self):
+        return self.digest.hex()
+
+    @hash.setter
+    def hash(self, valor):
+        self.digest = _a_digest(valor)
+
+    @property
+    def hash_anterior(self):
+        return self.digest_anterior.hex()
+
+    @hash_anterior.setter
+    def hash_anterior(self, valor):
+        self.digest_anterior = _a_digest(valor)
+
+    @property
+    def timestamp(self):
+        """Fecha y hora de creación en formato ISO (hora local), como antes."""
+        segundos, micro = divmod(self.timestamp_us, 1_000_000)
+        return datetime.fromtimestamp(segundos).replace(microsecond=micro).isoformat()
+
+    @timestamp.setter
+    def timestamp(self, valor):
+        instante = datetime.fromisoformat(valor)
+        self.timestamp_us = int(instante.timestamp()) * 1_000_000 + instante.microsecond
+
+    @property
+    def raiz_merkle(self):
+        """Raíz de Merkle de las transacciones (None si 'datos' no es una lista)."""
+        if isinstance(self.datos, (list, tuple)):
+            return raiz_merkle(self.datos)
+        return None
+
+    def prefijo_cabecera(self):
+        """Cabecera del bloque sin el nonce (lo que se precalcula al minar)."""
+        return prefijo_cabecera(self.indice, self.timestamp_us, compromiso_datos(self.datos),
+                                self.digest_anterior, self.dificultad)
+
+    def calcular_digest(self):
+        """Hash SHA-256 del bloque en bytes crudos (32 bytes)."""
+        return digest_cabecera(self.indice, self.timestamp_us, compromiso_datos(self.datos),
+                               self.digest_anterior, self.dificultad, self.nonce)
+
+    def calcular_hash(self):
+        """
+        Genera el hash SHA-256 del bloque a partir de todos sus campos.
+        Este hash garantiza la inmutabilidad: 
+        cualquier cambio en los datos alterará el hash.
+        """
+        return self.calcular_digest().hex()
+
+
+# ---------------------------
+# Datos de solo lectura
+# ---------------------------
+'''
+ La validación incremental solo vuelve a revisar los bloques que cambiaron, y
+ se entera de los cambios porque pasan por una asignación (bloque.datos = ...,
+ cadena[i] = ...). Una modificación en el sitio como bloque.datos[0]["monto"] = 1000
+ no pasaría por ninguna, así que los datos se guardan congelados: copias de
+ listas y diccionarios que rechazan cualquier modificación. Se imprimen y se
+ serializan igual que los originales, así que el hash del bloque no cambia.
+ Para cambiar los datos de un bloque hay que asignar bloque.datos de nuevo.
+'''
+
+def _solo_lectura(self, *args, **kwargs):
+    raise TypeError("Los datos de un bloque son de solo lectura; asigne bloque.datos para cambiarlos")
+
+
+class _ListaCongelada(list):
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _solo_lectura
+    append = extend = insert = pop = remove = clear = sort = reverse = _solo_lectura
+
+    def __reduce__(self):
+        return (_ListaCongelada, (list(self),))
+
+
+class _DiccionarioCongelado(dict):
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _solo_lectura
+    clear = pop = popitem = setdefault = update = _solo_lectura
+
+    def __reduce__(self):
+        return (_DiccionarioCongelado, (dict(self),))
+
+
+def congelar_datos(valor):
+    """Copia de solo lectura de 'valor' (listas y diccionarios anidados incluidos)."""
+    if isinstance(valor, (_ListaCongelada, _DiccionarioCongelado)):
+        return valor  # ya congelado (y su contenido también)
+    if isinstance(valor, dict):
+        return _DiccionarioCongelado((clave, congelar_datos(v)) for clave, v in valor.items())
+    if isinstance(valor, list):
+        return _ListaCongelada(congelar_datos(v) for v in valor)
+    if isinstance(valor, tuple):
+        return tuple(congelar_datos(v) for v in valor)
+    return valor
+
+
+class Bloque(_CamposBloque):
+    # __slots__ elimina el __dict__ de cada instancia: en cadenas de millones
+    # de bloques la diferencia de memoria es de cientos de bytes por bloque.
+    __slots__ = ("indice", "timestamp_us", "datos", "digest_anterior", "digest",
+                 "dificultad", "nonce", "_sucios", "_posicion")
+
+    def __init__(self, indice, datos, hash_anterior, dificultad=0):
         """
         Representa un bloque dentro de la blockchain.
         Cada bloque contiene:
@@ -15,31 +466,514 @@ class Bloque:
         - datos: información guardada en el bloque (transacción, registro, etc.)
         - hash_anterior: asegura el enlace con el bloque previo
         - hash: identificador único calculado con SHA-256
+        - dificultad y nonce: prueba de trabajo (dificultad 0 = sin prueba de trabajo;
+          con dificultad > 0 el bloque se debe minar con minar_bloque())
         """
+        self._sucios = None  # conjunto de la cadena donde avisar si el bloque cambia
         self.indice = indice
-        self.timestamp = datetime.now().isoformat()
+        self.timestamp_us = time.time_ns() // 1000
         self.datos = datos
         self.hash_anterior = hash_anterior
-        self.hash = self.calcular_hash()  # se calcula automáticamente al crear el bloque
-    
-    def calcular_hash(self):
+        self.dificultad = dificultad
+        self.nonce = 0
+        self.digest = self.calcular_digest()  # se calcula automáticamente al crear el bloque
+
+    @classmethod
+    def desde_campos(cls, indice, timestamp_us, datos, digest_anterior, digest, dificultad=0, nonce=0):
+        """Reconstruye un bloque ya existente (p. ej. leído de disco) sin recalcular su hash."""
+        bloque = cls.__new__(cls)
+        for nombre, valor in (("_sucios", None), ("indice", indice), ("timestamp_us", timestamp_us),
+                              ("datos", congelar_datos(datos)), ("digest_anterior", digest_anterior), ("digest", digest),
+                              ("dificultad", dificultad), ("nonce", nonce)):
+            object.__setattr__(bloque, nombre, valor)
+        return bloque
+
+    def __setattr__(self, nombre, valor):
         """
-        Genera el hash SHA-256 del bloque a partir de todos sus campos.
-        Este hash garantiza la inmutabilidad: 
-        cualquier cambio en los datos alterará el hash.
+        Cualquier cambio sobre un bloque ya enlazado en una cadena se registra
+        en el conjunto de bloques "sucios" de esa cadena, para que la
+        validación incremental vuelva a revisarlo.
         """
-        contenido = (
-            str(self.indice) +
-            self.timestamp +
-            str(self.datos) +
-            self.hash_anterior
+        if nombre == "datos":
+            valor = congelar_datos(valor)
+        object.__setattr__(self, nombre, valor)
+        if not nombre.startswith("_") and self._sucios is not None:
+            self._sucios.add(self._posicion)
+
+    def _vigilar(self, sucios, posicion):
+        """Enlaza el bloque con el registro de modificaciones de su cadena."""
+        object.__setattr__(self, "_posicion", posicion)
+        object.__setattr__(self, "_sucios", sucios)
+
+
+class BloqueColumnar(_CamposBloque):
+    """
+    Vista de un bloque guardado en una CadenaColumnar. No copia datos:
+    leer o escribir un campo accede directamente a las columnas.
+    """
+    __slots__ = ("_columnas", "_i")
+
+    def __init__(self, columnas, i):
+        object.__setattr__(self, "_columnas", columnas)
+        object.__setattr__(self, "_i", i)
+
+    def __setattr__(self, nombre, valor):
+        object.__setattr__(self, nombre, valor)
+        if not nombre.startswith("_") and self._columnas._sucios is not None:
+            self._columnas._sucios.add(self._i)
+
+    def _vigilar(self, sucios, posicion):
+        self._columnas._sucios = sucios
+
+    @property
+    def indice(self):
+        return self._columnas._indices[self._i]
+
+    @indice.setter
+    def indice(self, valor):
+        self._columnas._indices[self._i] = valor
+
+    @property
+    def timestamp_us(self):
+        return self._columnas._timestamps[self._i]
+
+    @timestamp_us.setter
+    def timestamp_us(self, valor):
+        self._columnas._timestamps[self._i] = valor
+
+    @property
+    def dificultad(self):
+        return self._columnas._dificultades[self._i]
+
+    @dificultad.setter
+    def dificultad(self, valor):
+        self._columnas._dificultades[self._i] = valor
+
+    @property
+    def nonce(self):
+        return self._columnas._nonces[self._i]
+
+    @nonce.setter
+    def nonce(self, valor):
+        self._columnas._nonces[self._i] = valor
+
+    @property
+    def datos(self):
+        return self._columnas._datos[self._i]
+
+    @datos.setter
+    def datos(self, valor):
+        self._columnas._datos[self._i] = congelar_datos(valor)
+
+    @property
+    def digest(self):
+        return bytes(self._columnas._digests[32 * self._i:32 * self._i + 32])
+
+    @digest.setter
+    def digest(self, valor):
+        self._columnas._digests[32 * self._i:32 * self._i + 32] = _a_digest(valor)
+
+    @property
+    def digest_anterior(self):
+        return bytes(self._columnas._anteriores[32 * self._i:32 * self._i + 32])
+
+    @digest_anterior.setter
+    def digest_anterior(self, valor):
+        self._columnas._anteriores[32 * self._i:32 * self._i + 32] = _a_digest(valor)
+
+
+class CadenaColumnar:
+    """
+    Almacenamiento columnar de bloques: en lugar de un objeto por bloque, cada
+    campo de la cabecera vive en un arreglo contiguo (array de enteros de 64 bits
+    para índice, timestamp y nonce, de 8 bits para la dificultad, y bytearray de
+    32 bytes por bloque para los hashes).
+    Se comporta como la lista 'cadena' original: len(), indexado, iteración y
+    append(bloque). Al indexar se obtiene un BloqueColumnar (vista sin copia).
+    """
+    def __init__(self):
+        self._indices = array('q')
+        self._timestamps = array('q')
+        self._dificultades = array('B')
+        self._nonces = array('Q')
+        self._digests = bytearray()
+        self._anteriores = bytearray()
+        self._datos = []
+        self._sucios = None
+
+    def __len__(self):
+        return len(self._datos)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [BloqueColumnar(self, j) for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("índice de bloque fuera de rango")
+        return BloqueColumnar(self, i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield BloqueColumnar(self, i)
+
+    def append(self, bloque):
+        """Copia los campos del bloque a las columnas."""
+        self._indices.append(bloque.indice)
+        self._timestamps.append(bloque.timestamp_us)
+        self._dificultades.append(bloque.dificultad)
+        self._nonces.append(bloque.nonce)
+        self._digests += bloque.digest
+        self._anteriores += bloque.digest_anterior
+        self._datos.append(congelar_datos(bloque.datos))
+
+
+class ListaBloques(list):
+    """
+    La lista 'cadena' de siempre, pero avisa a la validación incremental:
+    cadena[i] = otro_bloque marca la posición i como sucia, y los cambios de
+    estructura (borrar, insertar, reordenar, asignar por rebanadas...) se
+    cuentan en 'cambios' y obligan a una validación completa.
+    """
+    __slots__ = ("_sucios", "cambios")
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._sucios = None
+        self.cambios = 0
+
+    def __setitem__(self, i, valor):
+        super().__setitem__(i, valor)
+        if isinstance(i, slice):
+            self.cambios += 1
+        elif self._sucios is not None:
+            self._sucios.add(i % len(self))
+
+    def _estructural(metodo):
+        @functools.wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            self.cambios += 1
+            return metodo(self, *args, **kwargs)
+        return envoltura
+
+    __delitem__ = _estructural(list.__delitem__)
+    __imul__ = _estructural(list.__imul__)
+    insert = _estructural(list.insert)
+    pop = _estructural(list.pop)
+    remove = _estructural(list.remove)
+    clear = _estructural(list.clear)
+    sort = _estructural(list.sort)
+    reverse = _estructural(list.reverse)
+    del _estructural
+
+class AlmacenBloques:
+    """
+    Almacenamiento persistente de solo-anexado (append-only) para la cadena.
+    En el directorio indicado se mantienen tres archivos:
+    - bloques.log: registros [longitud u32][cabecera][datos JSON] uno tras otro.
+    - alturas.idx: un desplazamiento u64 por altura (altura -> posición en el log).
+    - hashes.idx:  el digest de 32 bytes de cada altura.
+    - hashes.tabla: tabla hash persistente digest -> altura (ver _abrir_tabla).
+    Los índices y el log se leen a través de mmap y los bloques se deserializan
+    solo cuando se accede a ellos, así que abrir una cadena de millones de bloques
+    cuesta lo mismo que abrir una vacía. Las escrituras se sincronizan a disco
+    (fsync) por lotes de 'lote_fsync' bloques o al llamar a sincronizar()/cerrar().
+    Se comporta como la lista 'cadena': len(), indexado, iteración y append(bloque).
+    Los datos de cada bloque deben ser serializables en JSON y volver de él con
+    el mismo JSON canónico, que es lo que compromete el hash: append() rechaza
+    los que no (p. ej. {1: "a", "1": "b"}, que pierde una clave). Se conserva el
+    hash, no los tipos: {1: "a"} o una tupla se releen como {"1": "a"} y lista.
+    """
+    # indice, timestamp_us, digest_anterior, digest, dificultad, nonce
+    _CABECERA = struct.Struct("<qq32s32sBQ")
+    _LONGITUD = struct.Struct("<I")
+    _DESPLAZAMIENTO = struct.Struct("<Q")
+    _TABLA = struct.Struct("<QQ")   # capacidad (potencia de 2), alturas [0, n) ya indexadas
+    _RANURA = struct.Struct("<Q")   # altura + 1 (0 = ranura libre)
+    _CAPACIDAD_TABLA = 1024
+
+    def __init__(self, directorio, lote_fsync=64):
+        os.makedirs(directorio, exist_ok=True)
+        self._rutas = {
+            "log": os.path.join(directorio, "bloques.log"),
+            "alturas": os.path.join(directorio, "alturas.idx"),
+            "hashes": os.path.join(directorio, "hashes.idx"),
+        }
+        for ruta in self._rutas.values():
+            open(ruta, 'ab').close()
+        self.lote_fsync = lote_fsync
+        self._n, self._fin_log = self._recuperar()
+        self._escritura = {nombre: open(ruta, 'ab') for nombre, ruta in self._rutas.items()}
+        self._lectura = {nombre: open(ruta, 'rb') for nombre, ruta in self._rutas.items()}
+        self._mapas = {}        # nombre -> mmap de solo lectura
+        self._pendientes = 0    # bloques escritos desde el último fsync
+        self._ultimo = None     # último bloque, para no deserializarlo en cada agregar_bloque
+        self._sucios = None
+        # Un proceso hijo creado con fork hereda los búferes de escritura sin vaciar;
+        # si los vaciara, esos bytes llegarían dos veces al archivo. Solo el proceso
+        # dueño del almacén vacía o escribe.
+        self._pid = os.getpid()
+        self._ruta_tabla = os.path.join(directorio, "hashes.tabla")
+        self._archivo_tabla = None
+        self._tabla = None
+        self._abrir_tabla()
+
+    def _recuperar(self):
+        """
+        Deja los tres archivos en un estado consistente tras un cierre inesperado:
+        descarta las alturas cuyo registro no llegó completo al log y recorta
+        lo escrito a medias. Solo mira el final de los archivos (tiempo constante).
+        """
+        tamano_log = os.path.getsize(self._rutas["log"])
+        n = min(os.path.getsize(self._rutas["alturas"]) // 8,
+                os.path.getsize(self._rutas["hashes"]) // 32)
+        fin_log = 0
+        with open(self._rutas["alturas"], 'rb') as alturas, open(self._rutas["log"], 'rb') as log:
+            while n > 0:
+                alturas.seek(8 * (n - 1))
+                (desplazamiento,) = self._DESPLAZAMIENTO.unpack(alturas.read(8))
+                log.seek(desplazamiento)
+                longitud = log.read(4)
+                if len(longitud) == 4:
+                    fin_log = desplazamiento + 4 + self._LONGITUD.unpack(longitud)[0]
+                    if fin_log <= tamano_log:
+                        break
+                n -= 1
+                fin_log = 0
+        for nombre, tamano in (("log", fin_log), ("alturas", 8 * n), ("hashes", 32 * n)):
+            with open(self._rutas[nombre], 'r+b') as f:
+                f.truncate(tamano)
+        return n, fin_log
+
+    # ---------------------------
+    # Índice hash -> altura
+    # ---------------------------
+    def _abrir_tabla(self):
+        """
+        hashes.tabla es una tabla hash de direccionamiento abierto: tras una
+        cabecera (capacidad, alturas indexadas) vienen 'capacidad' ranuras de
+        8 bytes con altura + 1, y la ranura inicial de un digest son sus primeros
+        8 bytes módulo la capacidad (sondeo lineal). Se lee por mmap, así que
+        buscar un hash tras reabrir la cadena es O(1) sin recorrerla.
+        Las ranuras solo son pistas: el digest se compara siempre con hashes.idx,
+        de modo que una ranura que sobrevivió a un bloque descartado por
+        _recuperar() no produce falsos positivos. Al abrir se indexan las alturas
+        que falten (cierre inesperado o tabla inexistente).
+        """
+        if os.path.exists(self._ruta_tabla) and os.path.getsize(self._ruta_tabla) >= self._TABLA.size:
+            self._archivo_tabla = open(self._ruta_tabla, 'r+b')
+            self._tabla = mmap.mmap(self._archivo_tabla.fileno(), 0)
+            capacidad, indexados = self._TABLA.unpack_from(self._tabla, 0)
+            if len(self._tabla) == self._TABLA.size + 8 * capacidad and 2 * self._n <= capacidad:
+                if self._n:
+                    hashes = self._mapa("hashes", 32 * self._n)
+                    for altura in range(min(indexados, self._n), self._n):
+                        self._indexar(altura, hashes[32 * altura:32 * altura + 32])
+                return
+        self._reconstruir_tabla(self._CAPACIDAD_TABLA)
+
+    def _reconstruir_tabla(self, capacidad):
+        """Reescribe hashes.tabla con todas las alturas (al crearla y al duplicar su capacidad)."""
+        while 2 * self._n > capacidad:
+            capacidad *= 2
+        tabla = bytearray(self._TABLA.size + 8 * capacidad)
+        if self._n:
+            hashes = self._mapa("hashes", 32 * self._n)
+            for altura in range(self._n):
+                digest = hashes[32 * altura:32 * altura + 32]
+                for posicion in self._sondeo(digest, capacidad):
+                    if not self._RANURA.unpack_from(tabla, posicion)[0]:
+                        self._RANURA.pack_into(tabla, posicion, altura + 1)
+                        break
+        self._TABLA.pack_into(tabla, 0, capacidad, self._n)
+        if self._tabla is not None:
+            self._tabla.close()
+            self._archivo_tabla.close()
+        # Archivo temporal + os.replace: la tabla anterior sigue válida si esto se interrumpe
+        descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(self._ruta_tabla), suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(tabla)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, self._ruta_tabla)
+        except BaseException:
+            os.unlink(temporal)
+            raise
+        self._archivo_tabla = open(self._ruta_tabla, 'r+b')
+        self._tabla = mmap.mmap(self._archivo_tabla.fileno(), 0)
+
+    def _sondeo(self, digest, capacidad):
+        """Desplazamientos de las ranuras a probar para 'digest', en orden."""
+        mascara = capacidad - 1
+        ranura = int.from_bytes(digest[:8], 'little') & mascara
+        for _ in range(capacidad):
+            yield self._TABLA.size + 8 * ranura
+            ranura = (ranura + 1) & mascara
+
+    def _indexar(self, altura, digest):
+        """Añade altura a la tabla (la duplica si pasaría de la mitad de ocupación)."""
+        capacidad, indexados = self._TABLA.unpack_from(self._tabla, 0)
+        if 2 * (indexados + 1) > capacidad:
+            self._reconstruir_tabla(2 * capacidad)  # ya incluye todas las alturas hasta self._n
+            return
+        for posicion in self._sondeo(digest, capacidad):
+            if not self._RANURA.unpack_from(self._tabla, posicion)[0]:
+                self._RANURA.pack_into(self._tabla, posicion, altura + 1)
+                break
+        self._TABLA.pack_into(self._tabla, 0, capacidad, max(indexados, altura + 1))
+
+    def _mapa(self, nombre, minimo):
+        """mmap de lectura del archivo, rehecho si el archivo creció más allá de lo mapeado."""
+        mapa = self._mapas.get(nombre)
+        if mapa is None or len(mapa) < minimo:
+            if os.getpid() == self._pid:
+                self._escritura[nombre].flush()
+            if mapa is not None:
+                mapa.close()
+            mapa = mmap.mmap(self._lectura[nombre].fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapas[nombre] = mapa
+        return mapa
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._n))]
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("índice de bloque fuera de rango")
+        if i == self._n - 1 and self._ultimo is not None:
+            return self._ultimo
+        alturas = self._mapa("alturas", 8 * (i + 1))
+        (desplazamiento,) = self._DESPLAZAMIENTO.unpack_from(alturas, 8 * i)
+        log = self._mapa("log", desplazamiento + 4)
+        (longitud,) = self._LONGITUD.unpack_from(log, desplazamiento)
+        inicio = desplazamiento + 4
+        log = self._mapa("log", inicio + longitud)
+        cabecera = self._CABECERA.unpack_from(log, inicio)
+        datos = json.loads(log[inicio + self._CABECERA.size:inicio + longitud].decode('utf-8'))
+        indice, timestamp_us, digest_anterior, digest, dificultad, nonce = cabecera
+        return Bloque.desde_campos(indice, timestamp_us, datos, digest_anterior, digest, dificultad, nonce)
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self[i]
+
+    def append(self, bloque):
+        """Anexa el bloque al log y a los índices (fsync cada 'lote_fsync' bloques)."""
+        if os.getpid() != self._pid:
+            raise RuntimeError("AlmacenBloques solo admite escrituras desde el proceso que lo abrió")
+        texto = json.dumps(bloque.datos, ensure_ascii=False)
+        if not isinstance(bloque.datos, str):
+            # Lo que se relea de disco tiene que comprometer los mismos bytes que el
+            # original. {1: "a"} vuelve como {"1": "a"} con el mismo JSON canónico
+            # (se acepta); {1: "a", "1": "b"} vuelve con una sola clave (se rechaza)
+            try:
+                conserva = serializar_transaccion(json.loads(texto)) == serializar_transaccion(bloque.datos)
+            except (TypeError, ValueError):
+                conserva = False
+            if not conserva:
+                raise ValueError("Los datos del bloque no se conservan al guardarlos en JSON "
+                                 "(use claves de texto y tipos JSON)")
+        cuerpo = (
+            self._CABECERA.pack(bloque.indice, bloque.timestamp_us, bloque.digest_anterior,
+                                bloque.digest, bloque.dificultad, bloque.nonce) +
+            texto.encode('utf-8')
         )
-        return hashlib.sha256(contenido.encode()).hexdigest()
+        self._escritura["log"].write(self._LONGITUD.pack(len(cuerpo)) + cuerpo)
+        self._escritura["alturas"].write(self._DESPLAZAMIENTO.pack(self._fin_log))
+        self._escritura["hashes"].write(bloque.digest)
+        self._fin_log += 4 + len(cuerpo)
+        self._n += 1
+        self._indexar(self._n - 1, bloque.digest)
+        self._ultimo = bloque
+        self._pendientes += 1
+        if self._pendientes >= self.lote_fsync:
+            self.sincronizar()
+
+    def altura_de(self, digest):
+        """Altura del bloque con ese digest (32 bytes) o None si no existe."""
+        if not self._n:
+            return None
+        hashes = self._mapa("hashes", 32 * self._n)
+        capacidad, _ = self._TABLA.unpack_from(self._tabla, 0)
+        for posicion in self._sondeo(digest, capacidad):
+            (valor,) = self._RANURA.unpack_from(self._tabla, posicion)
+            if not valor:
+                return None
+            altura = valor - 1
+            if altura < self._n and hashes[32 * altura:32 * altura + 32] == digest:
+                return altura
+        return None
+
+    def sincronizar(self):
+        """Vacía los búferes y fuerza la escritura a disco (log primero, luego índices)."""
+        if os.getpid() != self._pid:
+            return
+        for nombre in ("log", "alturas", "hashes"):
+            f = self._escritura[nombre]
+            f.flush()
+            os.fsync(f.fileno())
+        self._tabla.flush()
+        self._pendientes = 0
+
+    def cerrar(self):
+        """Sincroniza y libera archivos y mapas de memoria."""
+        self.sincronizar()
+        for mapa in self._mapas.values():
+            mapa.close()
+        self._mapas.clear()
+        # En un hijo de fork no se cierran los de escritura: close() vaciaría el búfer heredado
+        escritura = list(self._escritura.values()) if os.getpid() == self._pid else []
+        for f in escritura + list(self._lectura.values()):
+            f.close()
+        self._tabla.close()
+        self._archivo_tabla.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
 
 class Blockchain:
-    def __init__(self):
-        """ Inicializa la blockchain con un único bloque: el bloque génesis """
-        self.cadena = [self.crear_bloque_genesis()]
+    def __init__(self, columnar=False, ruta=None, dificultad=0, procesos=None):
+        """
+        Inicializa la blockchain con un único bloque: el bloque génesis.
+        Con columnar=True los bloques se guardan en una CadenaColumnar
+        (cabeceras en arreglos contiguos) en lugar de una lista de objetos.
+        Con ruta="directorio" la cadena se guarda en disco (AlmacenBloques) y,
+        si ya existía, se reabre con su último bloque sin leer el resto.
+        Con dificultad > 0 cada bloque nuevo se mina (prueba de trabajo) usando
+        'procesos' núcleos; las estadísticas del último minado quedan en
+        self.ultimo_minado. La dificultad es también el mínimo exigido al
+        validar: un bloque (salvo el génesis) con una menor es inválido.
+        """
+        self.dificultad = dificultad
+        self.procesos = procesos
+        self.ultimo_minado = None
+        if ruta is not None:
+            self.cadena = AlmacenBloques(ruta)
+        else:
+            self.cadena = CadenaColumnar() if columnar else ListaBloques()
+        if not len(self.cadena):
+            self.cadena.append(self.crear_bloque_genesis())
+        # Estado de la validación incremental:
+        # - _verificado_hasta: los bloques [0, _verificado_hasta) ya se comprobaron
+        # - _ultimo_verificado: digest del último bloque comprobado (detecta cambios en la lista)
+        # - _sucios: posiciones de bloques ya comprobados que se modificaron después
+        # - _cadena_verificada / _cambios_verificados: el contenedor comprobado y
+        #   su contador de cambios de estructura (ListaBloques.cambios) en ese momento
+        self._verificado_hasta = 0
+        self._ultimo_verificado = None
+        self._sucios = set()
+        self._cadena_verificada = None
+        self._cambios_verificados = 0
     
     def crear_bloque_genesis(self):
         """
@@ -52,38 +986,347 @@ class Blockchain:
         """ Devuelve el último bloque agregado a la cadena """
         return self.cadena[-1]
     
+    @instrumentar
     def agregar_bloque(self, datos):
         """
         Crea un nuevo bloque con los datos recibidos y lo enlaza
         al último bloque de la cadena usando el hash del bloque previo.
+        'datos' puede ser un valor simple o una lista de transacciones
+        (en ese caso el bloque se compromete con su raíz de Merkle).
         """
         ultimo = self.obtener_ultimo_bloque()
         nuevo_indice = ultimo.indice + 1
-        nuevo = Bloque(nuevo_indice, datos, ultimo.hash)
+        nuevo = Bloque(nuevo_indice, datos, ultimo.digest, self.dificultad)
+        if self.dificultad:
+            self.ultimo_minado = minar_bloque(nuevo, self.procesos)
         self.cadena.append(nuevo)
         return nuevo
+
+    def buscar_por_hash(self, hash_bloque):
+        """
+        Devuelve el bloque cuyo hash (hex o 32 bytes) coincide, o None.
+        Si el almacenamiento tiene índice por hash se usa; si no, se recorre la cadena.
+        """
+        digest = _a_digest(hash_bloque)
+        altura_de = getattr(self.cadena, "altura_de", None)
+        if altura_de is not None:
+            altura = altura_de(digest)
+            return None if altura is None else self.cadena[altura]
+        for bloque in self.cadena:
+            if bloque.digest == digest:
+                return bloque
+        return None
+
+    def primer_bloque_invalido(self, procesos=None, tam_rango=None):
+        """
+        Auditoría completa de la cadena repartida entre 'procesos' procesos
+        (por defecto todos los núcleos). A diferencia de es_cadena_valida, que
+        devuelve True/False, retorna la posición del primer bloque inválido o
+        None si toda la cadena es válida. No modifica la marca incremental.
+        """
+        global _CADENA_COMPARTIDA
+        n = len(self.cadena)
+        procesos = procesos or os.cpu_count() or 1
+        if procesos == 1:
+            return _revisar_rango(0, (_campos_bloque(b) for b in self.cadena), self.dificultad)
+
+        # Varios rangos por proceso para repartir bien la carga y poder parar antes
+        tam_rango = tam_rango or max(1000, -(-n // (procesos * 4)))
+        rangos = [(a, min(a + tam_rango, n)) for a in range(0, n, tam_rango)]
+        heredar = multiprocessing.get_start_method() == "fork"
+        # Los trabajadores leen los archivos del almacén: todo lo anexado tiene que
+        # estar ya en disco antes de crearlos (y ellos nunca vacían los búferes heredados)
+        sincronizar = getattr(self.cadena, "sincronizar", None)
+        if sincronizar is not None:
+            sincronizar()
+        if heredar:
+            _CADENA_COMPARTIDA = self.cadena  # debe fijarse antes de crear los procesos
+        try:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                if heredar:
+                    futuros = [pool.submit(_revisar_rango_compartido, a, b, self.dificultad) for a, b in rangos]
+                else:
+                    futuros = [pool.submit(_revisar_rango, a, [_campos_bloque(self.cadena[i]) for i in range(a, b)],
+                                           self.dificultad)
+                               for a, b in rangos]
+                # Se recorren los rangos en orden: el primer fallo encontrado es el primero de la cadena
+                for (a, _), futuro in zip(rangos, futuros):
+                    if a > 0 and self.cadena[a].digest_anterior != self.cadena[a - 1].digest:
+                        invalido = a  # enlace roto justo en la frontera entre rangos
+                    else:
+                        invalido = futuro.result()
+                    if invalido is not None:
+                        for pendiente in futuros:
+                            pendiente.cancel()
+                        return invalido
+            return None
+        finally:
+            _CADENA_COMPARTIDA = None
+
+    def prueba_inclusion(self, altura, posicion):
+        """
+        Prueba de inclusión de la transacción 'posicion' del bloque 'altura'.
+        Devuelve un diccionario serializable en JSON con la cabecera del bloque
+        (sin el cuerpo), la transacción y los hashes hermanos en hexadecimal;
+        se comprueba con verificar_prueba_bloque().
+        """
+        bloque = self.cadena[altura]
+        if not isinstance(bloque.datos, (list, tuple)):
+            raise ValueError("El bloque no contiene una lista de transacciones")
+        return {
+            "cabecera": {
+                "indice": bloque.indice,
+                "timestamp_us": bloque.timestamp_us,
+                "raiz_merkle": bloque.raiz_merkle.hex(),
+                "hash_anterior": bloque.hash_anterior,
+                "hash": bloque.hash,
+                "dificultad": bloque.dificultad,
+                "nonce": bloque.nonce,
+            },
+            "transaccion": bloque.datos[posicion],
+            "prueba": [(lado, hermano.hex()) for lado, hermano in prueba_inclusion(bloque.datos, posicion)],
+        }
+
+    def cerrar(self):
+        """Cierra el almacenamiento en disco, si lo hay (sin efecto para cadenas en memoria)."""
+        cerrar = getattr(self.cadena, "cerrar", None)
+        if cerrar is not None:
+            cerrar()
+
+    def _bloque_valido(self, i):
+        """
+        Comprueba el hash del bloque i, su prueba de trabajo y su enlace con el
+        bloque i-1. La dificultad de la cadena es un mínimo: un bloque no puede
+        declarar una menor (así no se puede rehacer la cadena con dificultad 0).
+        """
+        actual = self.cadena[i]
+        anterior = self.cadena[i-1]
+        if actual.digest != actual.calcular_digest():
+            return False
+        if actual.dificultad < self.dificultad:
+            return False
+        if not cumple_dificultad(actual.digest, actual.dificultad):
+            return False
+        if actual.digest_anterior != anterior.digest:
+            return False
+        return True
     
-    def es_cadena_valida(self):
+    @instrumentar
+    def es_cadena_valida(self, completa=False):
         """
-        Verifica la integridad de toda la blockchain.
+        Verifica la integridad de la blockchain.
         Revisa dos condiciones:
         1. Que el hash guardado coincida con el hash recalculado.
         2. Que el hash_anterior de cada bloque coincida con el hash real del bloque previo.
         Si alguna falla, significa que la cadena fue alterada.
+
+        Por defecto la validación es incremental: solo se revisan los bloques
+        agregados desde la última validación exitosa y los bloques ya
+        verificados que se modificaron (quedan marcados como "sucios").
+        Con completa=True se recorre toda la cadena como antes.
+        Los cambios se detectan porque pasan por una asignación: un campo del
+        bloque (los datos son de solo lectura, ver congelar_datos) o una
+        posición de la cadena (ListaBloques). Si self.cadena se sustituyó por
+        otro contenedor, o por uno que no lleva ese registro (p. ej. una list
+        normal), la validación es siempre completa.
         """
-        for i in range(1, len(self.cadena)):
-            actual = self.cadena[i]
-            anterior = self.cadena[i-1]
-            if actual.hash != actual.calcular_hash():
+        n = len(self.cadena)
+        desde = self._verificado_hasta
+        # Si la lista se acortó, cambió de estructura o se reemplazó el último
+        # bloque verificado, no podemos confiar en la marca: validación completa.
+        if (completa or desde > n
+                or self.cadena is not self._cadena_verificada
+                or not hasattr(self.cadena, "_sucios")
+                or getattr(self.cadena, "cambios", 0) != self._cambios_verificados
+                or (desde and self.cadena[desde - 1].digest != self._ultimo_verificado)):
+            desde = 0
+        revisar = set()
+        if desde:
+            for p in self._sucios:
+                revisar.update((p, p + 1))  # el bloque modificado y el enlace del siguiente
+        for i in sorted(revisar):
+            if 1 <= i < desde and not self._bloque_valido(i):
                 return False
-            if actual.hash_anterior != anterior.hash:
+        for i in range(max(desde, 1), n):
+            if not self._bloque_valido(i):
                 return False
+
+        # Todo correcto: avanzar la marca y vigilar los bloques recién verificados
+        # (y los que se colocaron en una posición ya verificada con cadena[i] = ...)
+        for i in revisar:
+            if i < desde:
+                self.cadena[i]._vigilar(self._sucios, i)
+        for i in range(desde, n):
+            self.cadena[i]._vigilar(self._sucios, i)
+        if isinstance(self.cadena, ListaBloques):
+            self.cadena._sucios = self._sucios
+        self._sucios.clear()
+        self._verificado_hasta = n
+        self._ultimo_verificado = self.cadena[-1].digest
+        self._cadena_verificada = self.cadena
+        self._cambios_verificados = getattr(self.cadena, "cambios", 0)
         return True
 
+
+# ===============================
+# BENCHMARK (python 5_BlockChain_Basic.py --bench [n_bloques])
+# ===============================
+def benchmark_validacion(n_bloques=1_000_000, columnar=False):
+    """
+    Compara la validación completa con la incremental sobre una cadena de
+    n_bloques: tras agregar un bloque y tras modificar un bloque ya verificado.
+    Devuelve un diccionario con los tiempos en segundos.
+    """
+    resultados = {"n_bloques": n_bloques}
+    cadena = Blockchain(columnar=columnar)
+    inicio = time.perf_counter()
+    for i in range(n_bloques - 1):
+        cadena.agregar_bloque(f"Transacción {i}")
+    resultados["construccion_s"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    assert cadena.es_cadena_valida(completa=True)
+    resultados["completa_s"] = time.perf_counter() - inicio
+
+    cadena.agregar_bloque("Bloque nuevo")
+    inicio = time.perf_counter()
+    assert cadena.es_cadena_valida()
+    resultados["incremental_tras_agregar_s"] = time.perf_counter() - inicio
+
+    cadena.cadena[n_bloques // 2].datos = "Dato alterado"
+    inicio = time.perf_counter()
+    assert not cadena.es_cadena_valida()
+    resultados["incremental_tras_modificar_s"] = time.perf_counter() - inicio
+    return resultados
+
+
+def memoria_por_bloque(n_bloques=1_000_000, columnar=False):
+    """
+    Bytes de memoria por bloque (medidos con tracemalloc) de una cadena
+    de n_bloques, incluyendo el texto de cada transacción.
+    """
+    gc.collect()
+    tracemalloc.start()
+    cadena = Blockchain(columnar=columnar)
+    for i in range(n_bloques - 1):
+        cadena.agregar_bloque(f"Transacción {i}")
+    usados, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return usados / n_bloques
+
+def benchmark_almacen(n_bloques=1_000_000, directorio="cadena_bench"):
+    """
+    Crea en disco una cadena de n_bloques y mide el coste de agregar bloques,
+    de reabrirla (recuperando el último bloque) y de buscar un bloque por hash.
+    """
+    resultados = {"n_bloques": n_bloques}
+    shutil.rmtree(directorio, ignore_errors=True)
+    cadena = Blockchain(ruta=directorio)
+    inicio = time.perf_counter()
+    for i in range(n_bloques - 1):
+        cadena.agregar_bloque(f"Transacción {i}")
+    cadena.cerrar()
+    resultados["agregar_us_por_bloque"] = (time.perf_counter() - inicio) / max(n_bloques - 1, 1) * 1e6
+
+    inicio = time.perf_counter()
+    cadena = Blockchain(ruta=directorio)
+    ultimo = cadena.obtener_ultimo_bloque()
+    resultados["reapertura_s"] = time.perf_counter() - inicio
+    resultados["altura_ultimo"] = ultimo.indice
+
+    medio = cadena.cadena[n_bloques // 2]
+    inicio = time.perf_counter()
+    assert cadena.buscar_por_hash(medio.hash).indice == medio.indice
+    resultados["primera_busqueda_hash_s"] = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    assert cadena.buscar_por_hash(ultimo.hash).indice == ultimo.indice
+    resultados["busqueda_hash_s"] = time.perf_counter() - inicio
+    cadena.cerrar()
+    shutil.rmtree(directorio, ignore_errors=True)
+    return resultados
+
+def benchmark_minado(dificultad=20, n_bloques=3, max_procesos=None):
+    """
+    Mina n_bloques con la dificultad dada usando 1, 2, 4, ... procesos (hasta
+    max_procesos, por defecto todos los núcleos) e informa el hashrate global
+    y por trabajador de cada configuración.
+    """
+    max_procesos = max_procesos or os.cpu_count() or 1
+    configuraciones = []
+    procesos = 1
+    while procesos < max_procesos:
+        configuraciones.append(procesos)
+        procesos *= 2
+    configuraciones.append(max_procesos)
+    resultados = []
+    for procesos in configuraciones:
+        cadena = Blockchain(dificultad=dificultad, procesos=procesos)
+        intentos = segundos = 0
+        por_trabajador = {}
+        for i in range(n_bloques):
+            cadena.agregar_bloque(f"Transacción {i}")
+            intentos += cadena.ultimo_minado["intentos"]
+            segundos += cadena.ultimo_minado["segundos"]
+            for t in cadena.ultimo_minado["por_trabajador"]:
+                acumulado = por_trabajador.setdefault(t["trabajador"], [0, 0.0])
+                acumulado[0] += t["intentos"]
+                acumulado[1] += t["segundos"]
+        assert cadena.es_cadena_valida()
+        resultados.append({
+            "procesos": procesos,
+            "hashrate": intentos / segundos if segundos else 0.0,
+            "hashrate_por_trabajador": [n / s if s else 0.0 for n, s in por_trabajador.values()],
+            "segundos_por_bloque": segundos / n_bloques,
+        })
+    return resultados
+
+def benchmark_validacion_paralela(n_bloques=1_000_000, max_procesos=None):
+    """
+    Tiempo de primer_bloque_invalido() sobre una cadena de n_bloques con
+    1, 2, 4, ... procesos y aceleración respecto a un solo proceso.
+    """
+    max_procesos = max_procesos or os.cpu_count() or 1
+    cadena = Blockchain()
+    for i in range(n_bloques - 1):
+        cadena.agregar_bloque(f"Transacción {i}")
+    configuraciones = []
+    procesos = 1
+    while procesos < max_procesos:
+        configuraciones.append(procesos)
+        procesos *= 2
+    configuraciones.append(max_procesos)
+    resultados = []
+    for procesos in configuraciones:
+        inicio = time.perf_counter()
+        assert cadena.primer_bloque_invalido(procesos) is None
+        segundos = time.perf_counter() - inicio
+        resultados.append({"procesos": procesos, "segundos": segundos,
+                           "aceleracion": resultados[0]["segundos"] / segundos if resultados else 1.0})
+    return resultados
+
 # ===============================
 # PROGRAMA PRINCIPAL
 # ===============================
-if __name__ == "__main__":
+if __name__ == "__main__" and "--bench" in sys.argv:
+    argumentos = [int(a) for a in sys.argv[1:] if a != "--bench"]
+    for columnar in (False, True):
+        print(f"--- Almacenamiento {'columnar' if columnar else 'lista de objetos'} ---")
+        for clave, valor in benchmark_validacion(*argumentos, columnar=columnar).items():
+            print(f"{clave}: {valor:.6f}" if isinstance(valor, float) else f"{clave}: {valor}")
+        print(f"bytes_por_bloque: {memoria_por_bloque(*argumentos, columnar=columnar):.1f}")
+    print("--- Almacenamiento en disco ---")
+    for clave, valor in benchmark_almacen(*argumentos).items():
+        print(f"{clave}: {valor:.6f}" if isinstance(valor, float) else f"{clave}: {valor}")
+    print("--- Minado (prueba de trabajo, dificultad 20) ---")
+    for r in benchmark_minado():
+        por_trabajador = ", ".join(f"{h:,.0f}" for h in r["hashrate_por_trabajador"])
+        print(f"{r['procesos']} proceso(s): {r['hashrate']:,.0f} H/s "
+              f"({r['segundos_por_bloque']:.2f} s/bloque) - por trabajador: {por_trabajador}")
+    print("--- Validación completa en paralelo ---")
+    for r in benchmark_validacion_paralela(*argumentos):
+        print(f"{r['procesos']} proceso(s): {r['segundos']:.3f} s (aceleración x{r['aceleracion']:.2f})")
+
+elif __name__ == "__main__":
     print("SIMULACIÓN BÁSICA DE BLOCKCHAIN")
     print("="*40)
     
@@ -110,3 +1353,13 @@ if __name__ == "__main__":
     
     # 5. Verificar integridad después del ataque (debe ser False)
     print("¿Cadena válida después de la modificación?", mi_blockchain.es_cadena_valida())
+
+    # 6. Bloque con varias transacciones y prueba de inclusión (Merkle)
+    print("\nBloque con varias transacciones (raíz de Merkle):")
+    otra_blockchain = Blockchain()
+    transacciones = [{"de": "Guillermo", "para": "Daniel", "monto": m} for m in range(1, 9)]
+    bloque = otra_blockchain.agregar_bloque(transacciones)
+    print(f"Raíz de Merkle: {bloque.raiz_merkle.hex()[:20]}...")
+    prueba = otra_blockchain.prueba_inclusion(bloque.indice, 5)
+    print(f"Prueba para la transacción 5: {len(prueba['prueba'])} hashes")
+    print("¿Prueba válida?", verificar_prueba_bloque(prueba))
@@ -2,10 +2,32 @@
 # Autores: Guillermo Campo y Daniel Zambrano
 # Universidad Militar Nueva Granada
 
-import requests
+import hashlib
+import http.client
+import io
+import json
+import math
+import os
+import select
 import ssl
 import socket
-from datetime import datetime
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+from seguridad import importar_perezoso
+from seguridad.metricas import instrumentar
+
+# requests y asyncio (solo para el escaneo masivo) se cargan en el primer uso:
+# importar este módulo es inmediato
+requests = importar_perezoso("requests")
+asyncio = importar_perezoso("asyncio")
 
 # ---- Configuración: cambia estos sitios si quieres probar otros ----
 HTTPS_SITE = "https://www.google.com"    # Sitio con HTTPS
@@ -14,15 +36,30 @@ HTTP_SITE = "http://neverssl.com"        # Sitio que intentionally no tiene HTTP
 # ---------------------------
 # Función: hacer petición HTTP/HTTPS con requests
 # ---------------------------
-def hacer_peticion(url, verificar_certificado=True, timeout=10):
+@instrumentar
+def hacer_peticion(url, verificar_certificado=True, timeout=10, sesion=None,
+                   stream=False, max_bytes=None, max_segundos=None, algoritmo_hash=None):
     """
     Realiza una petición GET con 'requests'.
-    - verificar_certificado: pasa verify=True/False a requests (True por defecto).
+    - verificar_certificado: pasa verify=True/False a requests (True por defecto);
+      también acepta la ruta a un archivo de CA propia (p. ej. una CA de pruebas).
+    - sesion: requests.Session opcional; si se pasa, se reutilizan sus conexiones
+      (sin nuevo handshake TCP/TLS por cada petición al mismo host).
+    - stream=True: el cuerpo se lee por bloques y solo se cuentan los bytes, sin
+      guardarlo en memoria (uso de memoria constante sea cual sea el tamaño).
+      En ese modo se puede además:
+        * max_bytes / max_segundos: dejar de leer al alcanzar ese tamaño o tiempo
+          ('truncado' = True y 'motivo_corte' indica cuál se alcanzó).
+        * algoritmo_hash (p. ej. "sha256"): calcular el hash del cuerpo al vuelo.
     - Devuelve diccionario con estado, tamaño, tiempo y encabezados (o error).
     """
     try:
         # requests hace la negociación TLS (si el esquema es https)
-        resp = requests.get(url, timeout=timeout, verify=verificar_certificado)
+        cliente = sesion if sesion is not None else requests
+        if stream:
+            return _leer_en_streaming(cliente, url, verificar_certificado, timeout,
+                                      max_bytes, max_segundos, algoritmo_hash)
+        resp = cliente.get(url, timeout=timeout, verify=verificar_certificado)
         return {
             "url": url,
             "ok": True,
@@ -41,39 +78,424 @@ def hacer_peticion(url, verificar_certificado=True, timeout=10):
         return {"url": url, "ok": False, "error": f"Other Error: {e}"}
 
 
+TAM_BLOQUE_STREAM = 64 * 1024
+
+
+def _leer_en_streaming(cliente, url, verificar_certificado, timeout, max_bytes, max_segundos, algoritmo_hash):
+    """
+    Modo stream de hacer_peticion(): lee el cuerpo por bloques sin acumularlo.
+    Cada lectura devuelve lo que ya haya llegado (read1 de urllib3) en vez de
+    esperar a completar 64 KiB, y mientras espera el socket tiene como timeout
+    lo que queda de max_segundos: un servidor que envía el cuerpo gota a gota
+    (o deja de enviar) se corta a tiempo con motivo_corte = "max_segundos".
+    Un cuerpo de exactamente max_bytes no cuenta como truncado: solo lo es si
+    después de max_bytes llega al menos un byte más.
+    """
+    from urllib3.exceptions import ReadTimeoutError
+
+    inicio = time.perf_counter()
+    limite = inicio + max_segundos if max_segundos is not None else None
+    timeout_lectura = timeout[1] if isinstance(timeout, tuple) else timeout
+    h = hashlib.new(algoritmo_hash) if algoritmo_hash else None
+    tamano = 0
+    motivo_corte = None
+    with cliente.get(url, timeout=timeout, verify=verificar_certificado, stream=True) as resp:
+        crudo = resp.raw
+        leer = getattr(crudo, "read1", None) or crudo.read  # read1: urllib3 >= 2.3
+        sock = getattr(getattr(crudo, "connection", None), "sock", None)
+        while True:
+            if limite is not None:
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    motivo_corte = "max_segundos"
+                    break
+                if sock is not None:
+                    sock.settimeout(restante if timeout_lectura is None else min(restante, timeout_lectura))
+            try:
+                bloque = leer(TAM_BLOQUE_STREAM, decode_content=True)
+            except (ReadTimeoutError, socket.timeout):
+                if limite is not None and time.perf_counter() >= limite:
+                    motivo_corte = "max_segundos"
+                    break
+                raise
+            if not bloque:
+                break
+            if max_bytes is not None and tamano + len(bloque) > max_bytes:
+                bloque = bloque[:max_bytes - tamano]  # contar y hashear exactamente max_bytes
+                motivo_corte = "max_bytes"
+            tamano += len(bloque)
+            if h is not None:
+                h.update(bloque)
+            if motivo_corte is not None:
+                break
+        resultado = {
+            "url": url,
+            "ok": True,
+            "status_code": resp.status_code,
+            "tamaño_bytes": tamano,
+            "tiempo_s": resp.elapsed.total_seconds(),   # hasta recibir los encabezados, como antes
+            "tiempo_total_s": time.perf_counter() - inicio,
+            "headers": dict(resp.headers),
+            "truncado": motivo_corte is not None,
+            "motivo_corte": motivo_corte,
+        }
+    if h is not None:
+        resultado["hash"] = h.hexdigest()  # del cuerpo leído (parcial si 'truncado')
+        resultado["algoritmo_hash"] = algoritmo_hash
+    return resultado
+
+
+# ---------------------------
+# Contextos TLS compartidos y reanudación de sesiones
+# ---------------------------
+'''
+ Crear un SSLContext nuevo en cada sondeo obliga a cargar las CAs cada vez y
+ hace imposible reanudar sesiones TLS. Aquí los sondeos comparten un contexto
+ por modo de verificación y guardan la última sesión TLS de cada
+ (host, puerto, SNI): la siguiente conexión la ofrece y, si el servidor la
+ acepta, el handshake se abrevia (sin intercambio de certificados ni clave
+ asimétrica completa). Las sesiones solo sirven con el contexto que las creó,
+ por eso se guardan por contexto.
+'''
+
+_CONTEXTOS = {}                                  # verificar_certificado -> SSLContext
+_SESIONES_TLS = weakref.WeakKeyDictionary()      # SSLContext -> {(host, puerto, sni): SSLSession}
+_LOCK_TLS = threading.Lock()
+
+
+def contexto_compartido(verificar_certificado=True):
+    """
+    SSLContext reutilizable equivalente al parámetro verify de requests
+    (True = CAs del sistema, False = sin verificar, str = ruta de una CA propia).
+    """
+    with _LOCK_TLS:
+        contexto = _CONTEXTOS.get(verificar_certificado)
+        if contexto is None:
+            if isinstance(verificar_certificado, str):
+                contexto = ssl.create_default_context(cafile=verificar_certificado)
+            else:
+                contexto = ssl.create_default_context()
+                if verificar_certificado is False:
+                    contexto.check_hostname = False
+                    contexto.verify_mode = ssl.CERT_NONE
+            _CONTEXTOS[verificar_certificado] = contexto
+        return contexto
+
+
+def _sesion_guardada(contexto, clave):
+    """Última sesión TLS guardada para (host, puerto, sni) con ese contexto, o None."""
+    with _LOCK_TLS:
+        return _SESIONES_TLS.get(contexto, {}).get(clave)
+
+
+def _guardar_sesion(contexto, clave, ssock, espera_ticket=0.0):
+    """
+    Guarda la sesión de la conexión para reanudarla más tarde y devuelve si
+    se pudo (False si el ticket no llegó).
+    En TLS 1.3 el servidor envía el ticket de sesión DESPUÉS del handshake, una
+    ida y vuelta más tarde. Si no se va a leer nada más de la conexión, con
+    espera_ticket > 0 se espera hasta esos segundos a que llegue: se vigila el
+    socket con select() y se procesa cada registro que llega con una lectura
+    sin bloqueo, hasta tener el ticket o agotar el plazo.
+    """
+    if espera_ticket > 0 and ssock.version() == "TLSv1.3" and not (ssock.session and ssock.session.has_ticket):
+        timeout = ssock.gettimeout()
+        limite = time.perf_counter() + espera_ticket
+        ssock.setblocking(False)
+        try:
+            while not (ssock.session and ssock.session.has_ticket):
+                restante = limite - time.perf_counter()
+                if restante <= 0 or not select.select([ssock], [], [], restante)[0]:
+                    break
+                try:
+                    if not ssock.recv(1):
+                        break  # el servidor cerró la conexión
+                except (ssl.SSLWantReadError, BlockingIOError):
+                    pass  # registro de control (el ticket) procesado, sin datos de aplicación
+        except (ssl.SSLError, OSError):
+            pass
+        finally:
+            ssock.settimeout(timeout)
+    sesion = ssock.session
+    if sesion is not None and (sesion.has_ticket or ssock.version() != "TLSv1.3"):
+        with _LOCK_TLS:
+            _SESIONES_TLS.setdefault(contexto, {})[clave] = sesion
+        return True
+    return False
+
+
+# ---------------------------
+# Petición instrumentada: tiempos por fase
+# ---------------------------
+'''
+ resp.elapsed de requests mezcla todas las fases. peticion_instrumentada()
+ hace la misma petición GET paso a paso y mide cada fase por separado:
+   DNS -> conexión TCP -> handshake TLS -> primer byte (TTFB) -> cuerpo.
+'''
+
+class _LectorCronometrado(io.RawIOBase):
+    """Lector sobre un socket que anota el instante en que llega el primer byte."""
+    def __init__(self, sock):
+        self._sock = sock
+        self.primer_byte = None
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self._sock.recv_into(buffer)
+        if n and self.primer_byte is None:
+            self.primer_byte = time.perf_counter()
+        return n
+
+
+class _SocketCronometrado:
+    """Adaptador mínimo para que http.client.HTTPResponse lea a través de _LectorCronometrado."""
+    def __init__(self, sock):
+        self.lector = _LectorCronometrado(sock)
+
+    def makefile(self, modo, *args, **kwargs):
+        return io.BufferedReader(self.lector)
+
+
+def peticion_instrumentada(url, verificar_certificado=True, timeout=10, contexto=None,
+                           reutilizar_sesion=True):
+    """
+    Realiza un GET midiendo por separado (en segundos):
+    - dns_s: resolución del nombre
+    - conexion_s: establecimiento de la conexión TCP
+    - tls_s: handshake TLS (0 en http://), con protocolo y cifrado negociados
+    - ttfb_s: desde enviar la petición hasta recibir el primer byte de respuesta
+    - transferencia_s: desde el primer byte hasta terminar de leer el cuerpo
+    Con reutilizar_sesion=True se ofrece la última sesión TLS del host y se
+    indica en 'sesion_reanudada' si el servidor la aceptó.
+    Devuelve un diccionario como el de hacer_peticion() con esos campos añadidos.
+    """
+    partes = urlsplit(url)
+    host = partes.hostname
+    es_https = partes.scheme == "https"
+    puerto = partes.port or (443 if es_https else 80)
+    ruta = (partes.path or "/") + (f"?{partes.query}" if partes.query else "")
+    # Host sin las credenciales que pueda traer la URL (usuario:clave@host)
+    cabecera_host = f"[{host}]" if ":" in host else host
+    if partes.port and partes.port != (443 if es_https else 80):
+        cabecera_host += f":{partes.port}"
+    try:
+        t0 = time.perf_counter()
+        familia, tipo, proto, _, direccion = socket.getaddrinfo(host, puerto, type=socket.SOCK_STREAM)[0]
+        t_dns = time.perf_counter()
+
+        # El socket se cierra aunque fallen la conexión o el handshake
+        with socket.socket(familia, tipo, proto) as crudo:
+            crudo.settimeout(timeout)
+            crudo.connect(direccion)
+            t_tcp = time.perf_counter()
+
+            sock = crudo
+            protocolo = cifrado = reanudada = None
+            if es_https:
+                contexto = contexto or contexto_compartido(verificar_certificado)
+                clave_sesion = (host, puerto, host)
+                sesion = _sesion_guardada(contexto, clave_sesion) if reutilizar_sesion else None
+                sock = contexto.wrap_socket(crudo, server_hostname=host, session=sesion)  # hace el handshake
+                protocolo, cifrado, reanudada = sock.version(), sock.cipher()[0], sock.session_reused
+            t_tls = time.perf_counter()
+
+            with sock:
+                sock.sendall(
+                    f"GET {ruta} HTTP/1.1\r\nHost: {cabecera_host}\r\n"
+                    f"User-Agent: python-instrumentado\r\nAccept: */*\r\nConnection: close\r\n\r\n".encode()
+                )
+                t_envio = time.perf_counter()
+                adaptador = _SocketCronometrado(sock)
+                resp = http.client.HTTPResponse(adaptador)
+                resp.begin()
+                tamano = 0
+                for bloque in iter(lambda: resp.read(65536), b""):
+                    tamano += len(bloque)
+                t_fin = time.perf_counter()
+                if es_https and reutilizar_sesion:
+                    _guardar_sesion(contexto, clave_sesion, sock)  # el ticket ya llegó con la respuesta
+        t_primer_byte = adaptador.lector.primer_byte or t_fin
+
+        return {
+            "url": url,
+            "ok": True,
+            "status_code": resp.status,
+            "tamaño_bytes": tamano,
+            "tiempo_s": t_fin - t0,
+            "headers": dict(resp.getheaders()),
+            "dns_s": t_dns - t0,
+            "conexion_s": t_tcp - t_dns,
+            "tls_s": t_tls - t_tcp,
+            "ttfb_s": t_primer_byte - t_envio,
+            "transferencia_s": t_fin - t_primer_byte,
+            "protocolo_tls": protocolo,
+            "cifrado": cifrado,
+            "sesion_reanudada": reanudada,
+        }
+    except ssl.SSLError as e:
+        return {"url": url, "ok": False, "error": f"SSL Error: {e}"}
+    except OSError as e:
+        return {"url": url, "ok": False, "error": f"Connection Error: {e}"}
+    except Exception as e:
+        return {"url": url, "ok": False, "error": f"Other Error: {e}"}
+
+
+FASES = ("dns_s", "conexion_s", "tls_s", "ttfb_s", "transferencia_s", "tiempo_s")
+
+
+def _percentil(valores_ordenados, p):
+    """Percentil p (0-100) por rango más cercano sobre una lista ya ordenada."""
+    k = max(0, min(len(valores_ordenados) - 1, math.ceil(p / 100 * len(valores_ordenados)) - 1))
+    return valores_ordenados[k]
+
+
+def informe_latencias(url, repeticiones=20, percentiles=(50, 90, 99), **opciones):
+    """
+    Repite peticion_instrumentada() y resume cada fase con mínimo, máximo y
+    percentiles. Devuelve {"url", "repeticiones", "errores", "fases": {fase: {...}},
+    "protocolo_tls", "cifrado"}.
+    """
+    resultados = [peticion_instrumentada(url, **opciones) for _ in range(repeticiones)]
+    correctos = [r for r in resultados if r["ok"]]
+    informe = {
+        "url": url,
+        "repeticiones": repeticiones,
+        "errores": [r["error"] for r in resultados if not r["ok"]],
+        "protocolo_tls": correctos[-1]["protocolo_tls"] if correctos else None,
+        "cifrado": correctos[-1]["cifrado"] if correctos else None,
+        "fases": {},
+    }
+    for fase in FASES:
+        valores = sorted(r[fase] for r in correctos)
+        if valores:
+            resumen = {"min": valores[0], "max": valores[-1]}
+            resumen.update({f"p{p}": _percentil(valores, p) for p in percentiles})
+            informe["fases"][fase] = resumen
+    return informe
+
+
+def imprimir_informe_latencias(informe):
+    """Tabla legible (en milisegundos) de informe_latencias()."""
+    print(f"URL: {informe['url']} ({informe['repeticiones']} repeticiones, "
+          f"{len(informe['errores'])} errores)")
+    if informe["protocolo_tls"]:
+        print(f"TLS: {informe['protocolo_tls']} - {informe['cifrado']}")
+    columnas = list(next(iter(informe["fases"].values()), {}).keys())
+    print(f"{'Fase':<16}" + "".join(f"{c + ' (ms)':>12}" for c in columnas))
+    for fase, resumen in informe["fases"].items():
+        print(f"{fase:<16}" + "".join(f"{resumen[c] * 1000:>12.2f}" for c in columnas))
+
+
+# ---------------------------
+# Sondeo de muchas URLs con conexiones reutilizables
+# ---------------------------
+class ProbadorHTTP:
+    """
+    Sondea URLs reutilizando conexiones: una requests.Session con un pool de
+    conexiones por host (keep-alive), de modo que varias peticiones al mismo
+    servidor pagan el handshake TCP + TLS una sola vez.
+    - pool_hosts: cuántos hosts distintos mantienen conexiones en el pool.
+    - conexiones_por_host: conexiones abiertas como máximo por host (conviene >= hilos).
+    - hilos: peticiones simultáneas de probar_lote().
+    - keep_alive=False pide al servidor cerrar la conexión tras cada respuesta.
+    - opciones_peticion: se pasan a hacer_peticion() (p. ej. stream=True, max_bytes=...).
+    Los resultados son los mismos diccionarios que devuelve hacer_peticion().
+    """
+    def __init__(self, verificar_certificado=True, timeout=10, hilos=8,
+                 pool_hosts=10, conexiones_por_host=8, keep_alive=True, **opciones_peticion):
+        self.verificar_certificado = verificar_certificado
+        self.timeout = timeout
+        self.opciones_peticion = opciones_peticion
+        self.hilos = hilos
+        self.sesion = requests.Session()
+        adaptador = requests.adapters.HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=conexiones_por_host)
+        self.sesion.mount("https://", adaptador)
+        self.sesion.mount("http://", adaptador)
+        if not keep_alive:
+            self.sesion.headers["Connection"] = "close"
+
+    def probar(self, url):
+        """Sondea una URL con la sesión compartida."""
+        return hacer_peticion(url, self.verificar_certificado, self.timeout, sesion=self.sesion,
+                              **self.opciones_peticion)
+
+    def probar_lote(self, urls):
+        """
+        Sondea una lista de URLs en paralelo con como mucho 'hilos' peticiones a la vez.
+        Devuelve los resultados en el mismo orden que 'urls'.
+        """
+        with ThreadPoolExecutor(max_workers=self.hilos) as pool:
+            return list(pool.map(self.probar, urls))
+
+    def cerrar(self):
+        """Cierra todas las conexiones del pool."""
+        self.sesion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
 # ---------------------------
 # Función: obtener e inspeccionar certificado TLS del servidor
 # ---------------------------
-def obtener_info_certificado(hostname, port=443, timeout=5):
+def obtener_info_certificado(hostname, port=443, timeout=5, sni=None, contexto=None,
+                             reutilizar_sesion=True):
     """
     Conecta al servidor usando un contexto SSL que VERIFICA la cadena y el hostname.
     Si la conexión y verificación son exitosas devuelve información relevante
     del certificado (issuer, subject, notBefore, notAfter).
     Si falla la verificación, levanta excepción que capturamos más arriba.
+    - sni: nombre a enviar en el SNI y a verificar (por defecto, hostname).
+    - contexto: ssl.SSLContext propio (p. ej. con una CA de pruebas).
+    - reutilizar_sesion: ofrecer la última sesión TLS de este host (handshake abreviado).
+    Además de los campos del certificado devuelve 'handshake_s' y 'sesion_reanudada'.
     """
-    context = ssl.create_default_context()  # contexto con CAs confiables por defecto
-    # Activar la verificación de nombre de host (hostname verification)
-    context.check_hostname = True
-    # verify_mode ya está en CERT_REQUIRED para create_default_context()
+    # Contexto compartido con CAs confiables por defecto: ya verifica el hostname
+    # y tiene verify_mode en CERT_REQUIRED. Es de todo el proceso (o del llamador),
+    # así que no se modifica: un contexto que no verifique el nombre se rechaza.
+    context = contexto or contexto_compartido(True)
+    if not context.check_hostname:
+        raise ValueError("obtener_info_certificado necesita un contexto con check_hostname=True")
 
     # Abrimos socket y envolvemos con TLS (esto realizará la validación del certificado)
+    clave_sesion = (hostname, port, sni or hostname)
+    sesion = _sesion_guardada(context, clave_sesion) if reutilizar_sesion else None
     with socket.create_connection((hostname, port), timeout=timeout) as sock:
-        with context.wrap_socket(sock, server_hostname=hostname) as ssock:
+        inicio = time.perf_counter()
+        with context.wrap_socket(sock, server_hostname=sni or hostname, session=sesion) as ssock:
+            handshake_s = time.perf_counter() - inicio
             # getpeercert devuelve un dict con campos como 'subject', 'issuer', 'notBefore', 'notAfter'
-            cert = ssock.getpeercert()
+            info = resumir_certificado(ssock.getpeercert())
+            info["handshake_s"] = handshake_s
+            info["sesion_reanudada"] = ssock.session_reused
+            if reutilizar_sesion:
+                # El ticket llega una ida y vuelta después del handshake (que ya dura al menos una)
+                _guardar_sesion(context, clave_sesion, ssock, espera_ticket=min(timeout, 2 * handshake_s))
+            return info
 
-            # Extraer sujeto (subject) y emisor (issuer) de forma legible
-            subject = {name: value for ((name, value),) in cert.get("subject", [])} if cert.get("subject") else {}
-            issuer = {name: value for ((name, value),) in cert.get("issuer", [])} if cert.get("issuer") else {}
 
-            return {
-                "subject": subject,
-                "issuer": issuer,
-                "notBefore": cert.get("notBefore"),  # formato típico: 'Jun 10 12:00:00 2025 GMT'
-                "notAfter": cert.get("notAfter"),
-                "version": cert.get("version"),
-                "serialNumber": cert.get("serialNumber")
-            }
+def resumir_certificado(cert):
+    """
+    Extrae de un certificado (dict de getpeercert) los campos que nos interesan:
+    sujeto y emisor de forma legible, fechas de validez, versión y número de serie.
+    """
+    # Extraer sujeto (subject) y emisor (issuer) de forma legible
+    subject = {name: value for ((name, value),) in cert.get("subject", [])} if cert.get("subject") else {}
+    issuer = {name: value for ((name, value),) in cert.get("issuer", [])} if cert.get("issuer") else {}
+
+    return {
+        "subject": subject,
+        "issuer": issuer,
+        "notBefore": cert.get("notBefore"),  # formato típico: 'Jun 10 12:00:00 2025 GMT'
+        "notAfter": cert.get("notAfter"),
+        "version": cert.get("version"),
+        "serialNumber": cert.get("serialNumber")
+    }
 
 
 # ---------------------------
@@ -93,10 +515,581 @@ def dias_para_expiracion(notAfter_str):
         return None
 
 
+def segundos_para_expiracion(notAfter_str):
+    """
+    Como dias_para_expiracion() pero en segundos (negativo si ya expiró),
+    para no redondear a 0 los certificados con menos de un día de vigencia.
+    Si falla, retorna None.
+    """
+    try:
+        return ssl.cert_time_to_seconds(notAfter_str) - time.time()
+    except Exception:
+        return None
+
+
+# ---------------------------
+# Caché de inspecciones de certificados
+# ---------------------------
+class CacheCertificados:
+    """
+    Caché con TTL delante de obtener_info_certificado(), con clave (host, puerto, SNI).
+    - ttl_s: segundos que se reutiliza un resultado.
+    - dias_refresco: cuando al certificado le quedan menos días que estos
+      (según segundos_para_expiracion), el TTL se acorta en proporción al
+      tiempo que le queda, para detectar pronto la renovación; solo un
+      certificado ya vencido se consulta siempre.
+    - ruta: archivo JSON opcional donde persistir la caché entre reinicios.
+    - intervalo_guardado_s: con 'ruta', los cambios se escriben como mucho una
+      vez cada tantos segundos (reescribir el archivo entero en cada fallo es
+      O(n) por fallo); guardar() o cerrar la caché (with ...) escribe lo pendiente.
+    Los contadores aciertos / fallos / refrescos_anticipados miden su efecto.
+    Solo se guardan los datos del certificado: handshake_s y sesion_reanudada
+    describen una conexión concreta y solo aparecen en la respuesta de un fallo.
+    """
+    _CAMPOS_DE_CONEXION = ("handshake_s", "sesion_reanudada")
+
+    def __init__(self, ttl_s=600, dias_refresco=7, ruta=None, intervalo_guardado_s=5.0):
+        self.ttl_s = ttl_s
+        self.dias_refresco = dias_refresco
+        self.ruta = ruta
+        self.intervalo_guardado_s = intervalo_guardado_s
+        self._entradas = {}  # (host, puerto, sni) -> (instante de guardado, info)
+        self._lock = threading.Lock()
+        self._lock_archivo = threading.Lock()  # una sola escritura del archivo a la vez
+        self._cambios = 0                      # modificaciones aún no escritas en 'ruta'
+        self._ultimo_guardado = time.monotonic()
+        self.aciertos = 0
+        self.fallos = 0
+        self.refrescos_anticipados = 0
+        if ruta and os.path.exists(ruta):
+            self._cargar()
+
+    def _ttl_efectivo(self, info):
+        """TTL de una entrada: completo, o reducido si el certificado está por expirar."""
+        restante = segundos_para_expiracion(info.get("notAfter"))
+        if restante is None or restante >= self.dias_refresco * 86400:
+            return self.ttl_s
+        if restante <= 0:
+            return 0
+        # Proporcional al tiempo restante y nunca más allá de la expiración
+        return min(self.ttl_s * restante / (self.dias_refresco * 86400), restante)
+
+    def obtener(self, host, port=443, sni=None, **opciones):
+        """
+        Devuelve la información del certificado, desde la caché si sigue vigente
+        o inspeccionando el servidor (las opciones se pasan a obtener_info_certificado).
+        """
+        clave = (host, port, sni or host)
+        ahora = time.time()
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                guardado, info = entrada
+                if ahora - guardado < self._ttl_efectivo(info):
+                    self.aciertos += 1
+                    return info
+                if ahora - guardado < self.ttl_s:
+                    self.refrescos_anticipados += 1  # caducó antes de tiempo por expiración cercana
+            self.fallos += 1
+
+        info = obtener_info_certificado(host, port, sni=sni, **opciones)
+        certificado = {k: v for k, v in info.items() if k not in self._CAMPOS_DE_CONEXION}
+        with self._lock:
+            self._entradas[clave] = (ahora, certificado)
+            self._cambios += 1
+        self._guardar_si_toca()
+        return info
+
+    def invalidar(self, host=None, port=443, sni=None):
+        """Olvida un host concreto o, sin argumentos, toda la caché."""
+        with self._lock:
+            if host is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop((host, port, sni or host), None)
+            self._cambios += 1
+        self.guardar()
+
+    def estadisticas(self):
+        """Entradas y contadores de la caché."""
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "refrescos_anticipados": self.refrescos_anticipados,
+                "tasa_aciertos": self.aciertos / total if total else 0.0,
+            }
+
+    def _guardar_si_toca(self):
+        """Escribe el archivo si hay cambios y ya pasó intervalo_guardado_s desde la última vez."""
+        if self.ruta and time.monotonic() - self._ultimo_guardado >= self.intervalo_guardado_s:
+            self.guardar()
+
+    def guardar(self):
+        """
+        Escribe ya los cambios pendientes en 'ruta' (sin efecto si no hay).
+        Bajo el lock de la caché solo se copia la lista de entradas; serializar
+        y escribir se hace fuera, sin bloquear las consultas de otros hilos.
+        El archivo se reemplaza de forma atómica con un temporal único
+        (mkstemp), así que varios procesos pueden compartir la misma ruta.
+        """
+        if not self.ruta:
+            return
+        with self._lock_archivo:
+            with self._lock:
+                if not self._cambios:
+                    return
+                cambios = self._cambios
+                entradas = list(self._entradas.items())
+            serializable = [
+                {"host": h, "port": p, "sni": sni, "guardado": guardado, "info": info}
+                for (h, p, sni), (guardado, info) in entradas
+            ]
+            directorio = os.path.dirname(os.path.abspath(self.ruta))
+            fd, temporal = tempfile.mkstemp(dir=directorio, prefix=".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(serializable, f, ensure_ascii=False)
+                os.replace(temporal, self.ruta)
+            except BaseException:
+                if os.path.exists(temporal):
+                    os.unlink(temporal)
+                raise
+            with self._lock:
+                self._cambios -= cambios
+            self._ultimo_guardado = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.guardar()
+
+    def _cargar(self):
+        """Carga la caché persistida (si el archivo está dañado se empieza vacía)."""
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                for e in json.load(f):
+                    info = {k: v for k, v in e["info"].items() if k not in self._CAMPOS_DE_CONEXION}
+                    self._entradas[(e["host"], e["port"], e["sni"])] = (e["guardado"], info)
+        except Exception:
+            self._entradas = {}
+
+
+# ---------------------------
+# Escaneo masivo de certificados con asyncio
+# ---------------------------
+def _normalizar_objetivo(objetivo):
+    """Acepta "host", "host:puerto", (host, puerto) o (host, puerto, sni) y devuelve (host, puerto, sni)."""
+    if isinstance(objetivo, str):
+        host, separador, puerto = objetivo.strip().rpartition(":")
+        if not separador:
+            host, puerto = puerto, 443
+        return host, int(puerto), host
+    host, puerto, *resto = objetivo
+    return host, int(puerto), resto[0] if resto else host
+
+
+async def _inspeccionar_certificado_async(host, puerto, sni, contexto, timeout):
+    """Handshake TLS sin bloquear y resumen del certificado presentado."""
+    _, escritor = await asyncio.wait_for(
+        asyncio.open_connection(host, puerto, ssl=contexto, server_hostname=sni), timeout)
+    try:
+        return resumir_certificado(escritor.get_extra_info("peercert") or {})
+    finally:
+        escritor.close()
+        try:
+            await asyncio.wait_for(escritor.wait_closed(), timeout)
+        except Exception:
+            pass  # el cierre no afecta al resultado
+
+
+async def _escanear_objetivo(host, puerto, sni, contexto, timeout, reintentos, espera_base):
+    """
+    Inspecciona un host reintentando con espera exponencial (espera_base, 2x, 4x...)
+    ante timeouts o errores de conexión. Un certificado inválido no se reintenta.
+    """
+    inicio = time.perf_counter()
+    for intento in range(1, reintentos + 2):
+        try:
+            info = await _inspeccionar_certificado_async(host, puerto, sni, contexto, timeout)
+            info.update({"host": host, "port": puerto, "ok": True, "intentos": intento,
+                         "dias_para_expiracion": dias_para_expiracion(info.get("notAfter")),
+                         "tiempo_s": time.perf_counter() - inicio})
+            return info
+        except ssl.SSLCertVerificationError as e:
+            error = f"SSL Error: {e}"
+            break
+        except asyncio.TimeoutError:
+            error = f"Timeout ({timeout}s)"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        if intento <= reintentos:
+            await asyncio.sleep(espera_base * 2 ** (intento - 1))
+    return {"host": host, "port": puerto, "ok": False, "error": error, "intentos": intento,
+            "tiempo_s": time.perf_counter() - inicio}
+
+
+async def escanear_certificados(objetivos, concurrencia=200, timeout=5, reintentos=2,
+                                espera_base=0.5, contexto=None):
+    """
+    Generador asíncrono que inspecciona el certificado de muchos hosts a la vez
+    y entrega cada resultado en cuanto está listo (no en el orden de entrada).
+    - concurrencia: número máximo de handshakes simultáneos.
+    - timeout: segundos por intento (conexión + handshake).
+    - reintentos / espera_base: reintentos con espera exponencial.
+    - contexto: ssl.SSLContext a usar (por defecto, el que verifica con las CAs del sistema;
+      para servidores de prueba se puede pasar uno con una CA propia).
+    Cada resultado incluye los campos de obtener_info_certificado() más
+    host, port, ok, intentos, tiempo_s y dias_para_expiracion (o 'error').
+    """
+    contexto = contexto or ssl.create_default_context()
+    pendientes = asyncio.Queue()
+    for objetivo in objetivos:
+        pendientes.put_nowait(_normalizar_objetivo(objetivo))
+    total = pendientes.qsize()
+    resultados = asyncio.Queue()
+
+    async def trabajador():
+        while True:
+            try:
+                host, puerto, sni = pendientes.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await resultados.put(await _escanear_objetivo(
+                host, puerto, sni, contexto, timeout, reintentos, espera_base))
+
+    tareas = [asyncio.create_task(trabajador()) for _ in range(min(concurrencia, total))]
+    try:
+        for _ in range(total):
+            yield await resultados.get()
+    finally:
+        for tarea in tareas:
+            tarea.cancel()
+
+
+def escanear_a_jsonl(objetivos, salida, **opciones):
+    """
+    Ejecuta escanear_certificados() y escribe un resultado JSON por línea en
+    'salida' (ruta o archivo abierto) a medida que llegan.
+    Devuelve un resumen con hosts, correctos, errores, segundos y hosts por segundo.
+    """
+    async def ejecutar(archivo):
+        resumen = {"hosts": 0, "ok": 0, "errores": 0}
+        async for resultado in escanear_certificados(objetivos, **opciones):
+            archivo.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            archivo.flush()
+            resumen["hosts"] += 1
+            resumen["ok" if resultado["ok"] else "errores"] += 1
+        return resumen
+
+    inicio = time.perf_counter()
+    if isinstance(salida, str):
+        with open(salida, "w", encoding="utf-8") as archivo:
+            resumen = asyncio.run(ejecutar(archivo))
+    else:
+        resumen = asyncio.run(ejecutar(salida))
+    resumen["segundos"] = time.perf_counter() - inicio
+    resumen["hosts_s"] = resumen["hosts"] / resumen["segundos"] if resumen["segundos"] else 0.0
+    return resumen
+
+
+# ---------------------------
+# Benchmark: handshake completo vs. sesión reanudada
+# ---------------------------
+def iniciar_servidor_tls_local(certfile, keyfile):
+    """
+    Arranca en un hilo un servidor TLS mínimo en 127.0.0.1 (puerto libre) que
+    solo completa el handshake y espera a que el cliente cierre. Sirve para
+    medir handshakes sin depender de la red. Devuelve (servidor, puerto);
+    se detiene con servidor.shutdown().
+    """
+    contexto = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    contexto.load_cert_chain(certfile, keyfile)
+
+    class Manejador(socketserver.BaseRequestHandler):
+        def handle(self):
+            try:
+                with contexto.wrap_socket(self.request, server_side=True) as ssock:
+                    ssock.recv(1)  # espera el cierre del cliente
+            except (ssl.SSLError, OSError):
+                pass
+
+    class Servidor(socketserver.ThreadingTCPServer):
+        daemon_threads = True
+        allow_reuse_address = True
+
+    servidor = Servidor(("127.0.0.1", 0), Manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, servidor.server_address[1]
+
+
+def benchmark_reanudacion(host, port=443, repeticiones=20, sni=None, contexto=None):
+    """
+    Compara la latencia del handshake TLS completo (sin reutilizar sesión) con
+    la del handshake reanudado, usando obtener_info_certificado().
+    Devuelve mediana y media (ms) de cada modo y cuántas reanudaciones aceptó el servidor.
+    """
+    contexto = contexto or contexto_compartido()
+    resultados = {}
+    for modo, reutilizar in (("completo", False), ("reanudado", True)):
+        obtener_info_certificado(host, port, sni=sni, contexto=contexto, reutilizar_sesion=reutilizar)  # calentamiento
+        tiempos, reanudadas = [], 0
+        for _ in range(repeticiones):
+            info = obtener_info_certificado(host, port, sni=sni, contexto=contexto, reutilizar_sesion=reutilizar)
+            tiempos.append(info["handshake_s"] * 1000)
+            reanudadas += bool(info["sesion_reanudada"])
+        tiempos.sort()
+        resultados[modo] = {"mediana_ms": tiempos[len(tiempos) // 2],
+                            "media_ms": sum(tiempos) / len(tiempos),
+                            "reanudadas": reanudadas}
+    return resultados
+
+
+# ===============================
+# AUTOPRUEBA LOCAL (python 6_HttpsRequest.py --probar-local)
+# ===============================
+'''
+ Comprueba el sondeo con conexiones reutilizables y el desglose de
+ latencias sin depender de la red: genera una CA de pruebas y un certificado
+ para 127.0.0.1 / localhost, levanta servidores HTTPS locales (uno de ellos
+ con retardos inyectados) y verifica los resultados con assert.
+'''
+
+def generar_ca_de_pruebas(directorio):
+    """
+    Crea en 'directorio' una CA autofirmada (ca.pem) y un certificado de
+    servidor firmado por ella para localhost y 127.0.0.1 (servidor.pem y
+    servidor.key). Válidos un día. Devuelve las tres rutas.
+    """
+    import ipaddress
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import ExtendedKeyUsageOID, NameOID
+
+    ahora = datetime.now(timezone.utc)
+    clave_ca = ec.generate_private_key(ec.SECP256R1())
+    clave_servidor = ec.generate_private_key(ec.SECP256R1())
+    nombre_ca = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "CA de pruebas del taller")])
+    nombre_servidor = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+
+    def base(sujeto, clave_publica):
+        return (x509.CertificateBuilder()
+                .subject_name(sujeto).issuer_name(nombre_ca).public_key(clave_publica)
+                .serial_number(x509.random_serial_number())
+                .not_valid_before(ahora - timedelta(minutes=5)).not_valid_after(ahora + timedelta(days=1))
+                .add_extension(x509.SubjectKeyIdentifier.from_public_key(clave_publica), critical=False)
+                .add_extension(x509.AuthorityKeyIdentifier.from_issuer_public_key(clave_ca.public_key()),
+                               critical=False))
+
+    cert_ca = (base(nombre_ca, clave_ca.public_key())
+               .add_extension(x509.BasicConstraints(ca=True, path_length=0), critical=True)
+               .add_extension(x509.KeyUsage(digital_signature=False, content_commitment=False,
+                                            key_encipherment=False, data_encipherment=False,
+                                            key_agreement=False, key_cert_sign=True, crl_sign=True,
+                                            encipher_only=False, decipher_only=False), critical=True)
+               .sign(clave_ca, hashes.SHA256()))
+    cert_servidor = (base(nombre_servidor, clave_servidor.public_key())
+                     .add_extension(x509.BasicConstraints(ca=False, path_length=None), critical=True)
+                     .add_extension(x509.SubjectAlternativeName([
+                         x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+                         critical=False)
+                     .add_extension(x509.ExtendedKeyUsage([ExtendedKeyUsageOID.SERVER_AUTH]), critical=False)
+                     .sign(clave_ca, hashes.SHA256()))
+
+    rutas = tuple(os.path.join(directorio, n) for n in ("ca.pem", "servidor.pem", "servidor.key"))
+    contenidos = (
+        cert_ca.public_bytes(serialization.Encoding.PEM),
+        cert_servidor.public_bytes(serialization.Encoding.PEM),
+        clave_servidor.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                     serialization.NoEncryption()),
+    )
+    for ruta, contenido in zip(rutas, contenidos):
+        with open(ruta, "wb") as f:
+            f.write(contenido)
+    return rutas
+
+
+def iniciar_servidor_https_local(certfile, keyfile, retardo_respuesta_s=0.0, retardo_cuerpo_s=0.0):
+    """
+    Arranca en un hilo un servidor HTTPS (HTTP/1.1 con keep-alive) en
+    127.0.0.1, puerto libre. GET /bytes/N responde N bytes (1024 en cualquier
+    otra ruta). servidor.conexiones cuenta las conexiones aceptadas, para
+    comprobar la reutilización. Retardos inyectados, para probar las fases de
+    peticion_instrumentada():
+    - retardo_respuesta_s: antes de enviar los encabezados (se ve en ttfb_s).
+    - retardo_cuerpo_s: entre la primera y la segunda mitad del cuerpo
+      (se ve en transferencia_s).
+    Devuelve (servidor, puerto); se detiene con servidor.shutdown().
+    """
+    import http.server  # solo la autoprueba lo usa; no encarece importar el módulo
+    contexto = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    contexto.load_cert_chain(certfile, keyfile)
+
+    class Manejador(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass  # sin una línea por petición en la salida
+
+        def do_GET(self):
+            partes = self.path.strip("/").split("/")
+            tamano = int(partes[1]) if partes[0] == "bytes" and len(partes) > 1 else 1024
+            time.sleep(retardo_respuesta_s)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(tamano))
+            self.end_headers()
+            self.wfile.write(b"x" * (tamano // 2))
+            time.sleep(retardo_cuerpo_s)
+            self.wfile.write(b"x" * (tamano - tamano // 2))
+
+    class Servidor(http.server.ThreadingHTTPServer):
+        daemon_threads = True
+        conexiones = 0
+
+        def get_request(self):
+            sock, direccion = super().get_request()
+            self.conexiones += 1
+            # El handshake se hace en el hilo de la conexión, no en el que acepta
+            return contexto.wrap_socket(sock, server_side=True, do_handshake_on_connect=False), direccion
+
+        def handle_error(self, request, client_address):
+            # Handshakes rechazados (p. ej. cliente sin la CA) y cierres del cliente son esperables
+            if not isinstance(sys.exc_info()[1], (ssl.SSLError, ConnectionError)):
+                super().handle_error(request, client_address)
+
+    servidor = Servidor(("127.0.0.1", 0), Manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, servidor.server_address[1]
+
+
+def prueba_local(n_urls=24, hilos=4, retardo_respuesta_s=0.15, retardo_cuerpo_s=0.1, repeticiones=5):
+    """
+    Autoprueba de ProbadorHTTP e informe_latencias() contra servidores HTTPS
+    locales con una CA de pruebas. Lanza AssertionError si algo no se comporta
+    como se espera y devuelve un resumen con lo medido.
+    """
+    resumen = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        ca, certificado, clave = generar_ca_de_pruebas(directorio)
+        servidor, puerto = iniciar_servidor_https_local(certificado, clave)
+        base = f"https://127.0.0.1:{puerto}"
+        urls = [f"{base}/bytes/{1000 + i}" for i in range(n_urls)]
+        try:
+            # 1. Lote con keep-alive: todas bien, en orden y sobre como mucho 'hilos' conexiones
+            with ProbadorHTTP(verificar_certificado=ca, hilos=hilos, conexiones_por_host=hilos) as probador:
+                resultados = probador.probar_lote(urls)
+            assert all(r["ok"] for r in resultados), [r.get("error") for r in resultados if not r["ok"]]
+            assert [r["url"] for r in resultados] == urls
+            assert [r["tamaño_bytes"] for r in resultados] == [1000 + i for i in range(n_urls)]
+            assert all(r["status_code"] == 200 for r in resultados)
+            resumen["conexiones_keep_alive"] = servidor.conexiones
+            assert servidor.conexiones <= hilos, servidor.conexiones
+
+            # 2. Sin keep-alive: una conexión (y un handshake) por URL
+            antes = servidor.conexiones
+            with ProbadorHTTP(verificar_certificado=ca, hilos=hilos, keep_alive=False) as probador:
+                assert all(r["ok"] for r in probador.probar_lote(urls))
+            resumen["conexiones_sin_keep_alive"] = servidor.conexiones - antes
+            assert servidor.conexiones - antes == n_urls
+
+            # 3. Sin la CA de pruebas el certificado no es de confianza
+            with ProbadorHTTP(verificar_certificado=True, hilos=hilos) as probador:
+                fallidos = probador.probar_lote(urls[:hilos])
+            assert all(not r["ok"] and r["error"].startswith("SSL Error") for r in fallidos)
+
+            # 4. Modo stream con límite de tamaño y hash al vuelo
+            with ProbadorHTTP(verificar_certificado=ca, stream=True, max_bytes=1500,
+                              algoritmo_hash="sha256") as probador:
+                cortado, completo = probador.probar_lote([f"{base}/bytes/4096", f"{base}/bytes/1500"])
+            assert cortado["truncado"] and cortado["motivo_corte"] == "max_bytes"
+            assert cortado["tamaño_bytes"] == 1500 and cortado["hash"] == hashlib.sha256(b"x" * 1500).hexdigest()
+            assert not completo["truncado"] and completo["tamaño_bytes"] == 1500
+        finally:
+            servidor.shutdown()
+            servidor.server_close()
+
+        # 5. Fases de latencia contra un servidor con retardos conocidos
+        lento, puerto = iniciar_servidor_https_local(certificado, clave, retardo_respuesta_s, retardo_cuerpo_s)
+        url = f"https://127.0.0.1:{puerto}/bytes/65536"
+        try:
+            contexto = ssl.create_default_context(cafile=ca)  # propio: sin sesiones de otras pruebas
+            primera = peticion_instrumentada(url, contexto=contexto)
+            segunda = peticion_instrumentada(url, contexto=contexto)
+            assert primera["ok"] and segunda["ok"], (primera.get("error"), segunda.get("error"))
+            assert primera["tamaño_bytes"] == 65536
+            assert sum(primera[f] for f in FASES[:-1]) <= primera["tiempo_s"] + 1e-6
+            assert segunda["sesion_reanudada"], "el servidor no aceptó la sesión TLS guardada"
+
+            informe = informe_latencias(url, repeticiones, contexto=contexto)
+            fases = informe["fases"]
+            resumen["latencias_ms"] = {f: round(fases[f]["p50"] * 1000, 1) for f in FASES}
+            assert not informe["errores"], informe["errores"]
+            assert informe["protocolo_tls"].startswith("TLS") and informe["cifrado"]
+            assert set(fases) == set(FASES)
+            assert fases["ttfb_s"]["min"] >= retardo_respuesta_s
+            assert fases["ttfb_s"]["p50"] < retardo_respuesta_s + 0.5
+            # el primer byte se anota al leerlo, algo después de que el servidor lo envía
+            assert fases["transferencia_s"]["min"] >= 0.9 * retardo_cuerpo_s
+            assert fases["transferencia_s"]["p50"] < retardo_cuerpo_s + 0.5
+            assert fases["tiempo_s"]["min"] >= retardo_respuesta_s + retardo_cuerpo_s
+            assert fases["dns_s"]["max"] < retardo_respuesta_s  # IP literal: sin consulta real
+            assert fases["tls_s"]["min"] > 0
+        finally:
+            lento.shutdown()
+            lento.server_close()
+    return resumen
+
+
 # ---------------------------
 # Programa principal: ejecutar pruebas y mostrar resultados
 # ---------------------------
-if __name__ == "__main__":
+if __name__ == "__main__" and "--probar-local" in sys.argv:
+    # Uso: python 6_HttpsRequest.py --probar-local
+    for clave, valor in prueba_local().items():
+        print(f"{clave}: {valor}")
+    print("Autoprueba local: OK")
+
+elif __name__ == "__main__" and "--escanear" in sys.argv:
+    # Uso: python 6_HttpsRequest.py --escanear hosts.txt [salida.jsonl]
+    # (hosts.txt: un "host" o "host:puerto" por línea)
+    argumentos = [a for a in sys.argv[1:] if a != "--escanear"]
+    with open(argumentos[0], encoding="utf-8") as f:
+        objetivos = [linea.strip() for linea in f if linea.strip() and not linea.startswith("#")]
+    resumen = escanear_a_jsonl(objetivos, argumentos[1] if len(argumentos) > 1 else sys.stdout)
+    print(f"{resumen['hosts']} hosts ({resumen['ok']} ok, {resumen['errores']} errores) "
+          f"en {resumen['segundos']:.1f}s - {resumen['hosts_s']:.1f} hosts/s", file=sys.stderr)
+
+elif __name__ == "__main__" and "--latencias" in sys.argv:
+    # Uso: python 6_HttpsRequest.py --latencias URL [repeticiones]
+    argumentos = [a for a in sys.argv[1:] if a != "--latencias"]
+    url = argumentos[0] if argumentos else HTTPS_SITE
+    repeticiones = int(argumentos[1]) if len(argumentos) > 1 else 20
+    imprimir_informe_latencias(informe_latencias(url, repeticiones))
+
+elif __name__ == "__main__" and "--reanudacion" in sys.argv:
+    # Uso: python 6_HttpsRequest.py --reanudacion HOST[:PUERTO] [repeticiones]
+    #      python 6_HttpsRequest.py --reanudacion --local cert.pem key.pem [repeticiones]
+    #      (--local: servidor TLS propio en 127.0.0.1; cert.pem debe ser válido para "localhost")
+    argumentos = [a for a in sys.argv[1:] if a not in ("--reanudacion", "--local")]
+    if "--local" in sys.argv:
+        servidor, puerto = iniciar_servidor_tls_local(argumentos[0], argumentos[1])
+        objetivo = ("localhost", puerto, contexto_compartido(argumentos[0]))
+        repeticiones = int(argumentos[2]) if len(argumentos) > 2 else 50
+    else:
+        host, puerto, _ = _normalizar_objetivo(argumentos[0] if argumentos else "www.google.com")
+        objetivo = (host, puerto, None)
+        repeticiones = int(argumentos[1]) if len(argumentos) > 1 else 20
+    host, puerto, contexto = objetivo
+    for modo, r in benchmark_reanudacion(host, puerto, repeticiones, contexto=contexto).items():
+        print(f"Handshake {modo:<10} mediana {r['mediana_ms']:.2f} ms, media {r['media_ms']:.2f} ms, "
+              f"reanudadas {r['reanudadas']}/{repeticiones}")
+
+elif __name__ == "__main__":
     print("=== PRUEBA BÁSICA DE HTTP vs HTTPS ===\n")
 
     # 1) Petición al sitio HTTPS (verificando certificado)
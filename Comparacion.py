@@ -1,90 +1,311 @@
 import base64
-from cryptography.fernet import Fernet
-from PIL import Image
-import numpy as np
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import random
 
-# Mensaje secreto a proteger
-mensaje_secreto = "El ataque será a las 15:00 en punto"
-
-print("=== COMPARACIÓN DE TÉCNICAS DE SEGURIDAD ===")
-print(f"Mensaje original: {mensaje_secreto}\n")
-
-# 1. CRIPTOGRAFÍA (Cifrado AES con Fernet)
-print("1. CRIPTOGRAFÍA (Cifrado AES)")
-# Generar clave de cifrado
-clave = Fernet.generate_key()
-cipher = Fernet(clave)
-# Cifrar mensaje
-mensaje_cifrado = cipher.encrypt(mensaje_secreto.encode())
-print(f"Mensaje cifrado: {mensaje_cifrado.decode()}")
-# Descifrar mensaje
-mensaje_descifrado = cipher.decrypt(mensaje_cifrado).decode()
-print(f"Mensaje descifrado: {mensaje_descifrado}")
-print("→ Evidente que hay información cifrada pero no se puede leer sin clave\n")
+from seguridad import importar_perezoso
+
+# Dependencias pesadas: se cargan en el primer uso (importar este módulo es inmediato)
+_fernet = importar_perezoso("cryptography.fernet")
+Image = importar_perezoso("PIL.Image")
+np = importar_perezoso("numpy")
 
 # 2. ESTEGANOGRAFÍA (Ocultar en imagen LSB)
-print("2. ESTEGANOGRAFÍA (Ocultar en imagen)")
+def _escribir_lsb(array_img, datos):
+    # Convertir datos a bits desempaquetados en una sola llamada
+    # (bit más significativo primero)
+    bits = np.unpackbits(np.frombuffer(datos, dtype=np.uint8))
+
+    # Vista plana de la imagen en el mismo orden fila -> columna -> canal
+    plano = array_img.reshape(-1)
+    if bits.size > plano.size:
+        raise ValueError(f"La imagen admite {plano.size // 8} bytes y se necesitan {len(datos)}")
+
+    # Modificar solo el bit menos significativo de los primeros N valores
+    plano[:bits.size] = (plano[:bits.size] & 0xFE) | bits
+    return array_img
+
+def _leer_lsb(array_img, inicio, n_bytes):
+    # Bytes [inicio, inicio + n_bytes) escritos por _escribir_lsb (menos si la imagen se acaba)
+    plano = array_img.reshape(-1)
+    fin = min(8 * (inicio + n_bytes), plano.size - plano.size % 8)  # solo bytes completos
+    return np.packbits(plano[8 * inicio:fin] & 1).tobytes()
+
+def _ocultar_en_array(array_img, datos):
+    # Formato de una sola imagen: bytes + byte 0 como marcador de fin.
+    # Un byte 0 dentro del mensaje cortaría la extracción en silencio, así que
+    # se rechaza (los datos binarios van con la cabecera de longitud de ocultar_lote)
+    datos = bytes(datos)
+    if b'\x00' in datos:
+        raise ValueError("El mensaje contiene bytes 0 (el marcador de fin); para datos binarios use ocultar_lote")
+    plano = array_img.reshape(-1)
+    if 8 * (len(datos) + 1) > plano.size:
+        raise ValueError(f"La imagen admite {plano.size // 8 - 1} bytes y el mensaje ocupa {len(datos)}")
+    return _escribir_lsb(array_img, datos + b'\x00')
+
+def _extraer_de_array(array_img, bytes_iniciales=1024):
+    plano = array_img.reshape(-1)
+
+    # Leer los bits menos significativos por tramos (de 'bytes_iniciales' bytes,
+    # duplicando el tramo cada vez) y empaquetarlos en bytes con packbits.
+    # Se para en el primer byte 0 (marcador de fin): el coste depende del
+    # largo del mensaje, no del tamaño de la imagen.
+    mensaje = bytearray()
+    inicio = 0
+    tramo = 8 * bytes_iniciales
+    total = plano.size - plano.size % 8  # solo bytes completos
+    while inicio < total:
+        fin = min(inicio + tramo, total)
+        bytes_tramo = np.packbits(plano[inicio:fin] & 1).tobytes()
+        fin_mensaje = bytes_tramo.find(0)
+        if fin_mensaje != -1:  # Fin de mensaje
+            mensaje += bytes_tramo[:fin_mensaje]
+            break
+        mensaje += bytes_tramo
+        inicio = fin
+        tramo *= 2
+    return bytes(mensaje)
+
 def ocultar_mensaje_lsb(ruta_imagen, mensaje, ruta_salida):
     # Abrir imagen y convertir a array
     img = Image.open(ruta_imagen)
     array_img = np.array(img)
-    
-    # Convertir mensaje a binario
-    bin_mensaje = ''.join([format(ord(c), '08b') for c in mensaje])
-    bin_mensaje += '00000000'  # Marcador de fin
-    
-    # Ocultar en bits menos significativos
-    alt, anc, canales = array_img.shape
-    idx = 0
-    for i in range(alt):
-        for j in range(anc):
-            for k in range(canales):
-                if idx < len(bin_mensaje):
-                    # Modificar solo el bit menos significativo
-                    array_img[i][j][k] = (array_img[i][j][k] & 0xFE) | int(bin_mensaje[idx])
-                    idx += 1
-    
+
+    # Ocultar los bytes UTF-8 del mensaje en los LSB
+    _ocultar_en_array(array_img, mensaje.encode('utf-8'))
+
     # Guardar imagen con mensaje oculto
     img_oculta = Image.fromarray(array_img)
     img_oculta.save(ruta_salida)
     return f"Mensaje oculto en {ruta_salida}"
 
-def extraer_mensaje_lsb(ruta_imagen):
+def extraer_mensaje_lsb(ruta_imagen, bytes_iniciales=1024):
     # Abrir imagen con mensaje oculto
     img = Image.open(ruta_imagen)
     array_img = np.array(img)
-    
-    # Extraer bits menos significativos
-    bin_mensaje = ""
-    alt, anc, canales = array_img.shape
-    for i in range(alt):
-        for j in range(anc):
-            for k in range(canales):
-                bin_mensaje += str(array_img[i][j][k] & 1)
-    
-    # Convertir binario a texto
-    mensaje = ""
-    for i in range(0, len(bin_mensaje), 8):
-        byte = bin_mensaje[i:i+8]
-        if byte == '00000000':  # Fin de mensaje
+    return _extraer_de_array(array_img, bytes_iniciales).decode('utf-8', errors='replace')
+
+# ---------------------------
+# Esteganografía por lotes (pool de procesos)
+# ---------------------------
+'''
+Para miles de imágenes el coste está en decodificar y recodificar PNG, no en
+tocar los LSB, así que se reparte imagen a imagen entre procesos:
+- Las rutas se recorren de forma perezosa (directorios en orden alfabético) y
+  se envían al pool con una ventana acotada de tareas en vuelo, de modo que la
+  memoria no crece con el número de imágenes y los resultados salen en orden.
+- Cada trabajador decodifica, oculta o extrae y recodifica su imagen. Las
+  salidas se escriben en un temporal del mismo directorio y se publican con
+  os.replace: nunca queda un PNG a medio escribir con el nombre final.
+- Cada imagen lleva delante del fragmento una cabecera _CABECERA_LOTE: firma,
+  id del mensaje (8 primeros bytes de su SHA-256), posición del fragmento,
+  número de fragmentos y longitud. Así los datos pueden contener cualquier
+  byte (no hay marcador de fin) y unir_fragmentos ordena por la posición
+  guardada, no por el nombre de los archivos, y comprueba que no falte nada.
+- Con dividir=True el mensaje se reparte entre las imágenes según su capacidad
+  (leída de la cabecera, sin decodificar píxeles); extraer_lote + unir_fragmentos
+  lo reconstruyen.
+- Las salidas se llaman como la imagen de origen con extensión .png; si dos
+  entradas darían el mismo nombre (a/img.png y b/img.png, o x.png y x.bmp) la
+  segunda se guarda como img-2.png, img-3.png...
+Las salidas son siempre PNG (sin pérdidas). MB/s se mide sobre los bytes de
+píxeles decodificados.
+'''
+EXTENSIONES_IMAGEN = (".png", ".bmp", ".tif", ".tiff")
+_CABECERA_LOTE = struct.Struct("<4s8sIII")  # firma, id del mensaje, posición, total, longitud
+_FIRMA_LOTE = b"LSB\x01"
+_MODOS_LSB = {"L": 1, "RGB": 3, "RGBA": 4}  # otros modos se convierten a RGB
+
+def listar_imagenes(rutas):
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            for nombre in sorted(os.listdir(ruta)):
+                if nombre.lower().endswith(EXTENSIONES_IMAGEN):
+                    yield os.path.join(ruta, nombre)
+        else:
+            yield ruta
+
+def capacidad_imagen(ruta):
+    # Bytes de mensaje que caben en una imagen de un lote (descontando la cabecera)
+    with Image.open(ruta) as img:
+        ancho, alto = img.size
+        canales = _MODOS_LSB.get(img.mode, 3)
+    return max(ancho * alto * canales // 8 - _CABECERA_LOTE.size, 0)
+
+def _cargar_array(ruta):
+    with Image.open(ruta) as img:
+        if img.mode not in _MODOS_LSB:
+            img = img.convert("RGB")
+        return np.array(img)
+
+def _guardar_atomico(array_img, ruta_salida):
+    directorio = os.path.dirname(os.path.abspath(ruta_salida))
+    fd, ruta_tmp = tempfile.mkstemp(dir=directorio, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            Image.fromarray(array_img).save(f, format="PNG")
+        os.replace(ruta_tmp, ruta_salida)
+    except BaseException:
+        if os.path.exists(ruta_tmp):
+            os.unlink(ruta_tmp)
+        raise
+
+def _ocultar_fragmento(array_img, fragmento, id_mensaje, indice, total):
+    cabecera = _CABECERA_LOTE.pack(_FIRMA_LOTE, id_mensaje, indice, total, len(fragmento))
+    return _escribir_lsb(array_img, cabecera + fragmento)
+
+def _extraer_fragmento(array_img):
+    # Devuelve (datos, {"id", "indice", "total"}) de una imagen de un lote, o
+    # (datos, None) si la imagen tiene el formato de ocultar_mensaje_lsb
+    cabecera = _leer_lsb(array_img, 0, _CABECERA_LOTE.size)
+    if len(cabecera) == _CABECERA_LOTE.size and cabecera.startswith(_FIRMA_LOTE):
+        _, id_mensaje, indice, total, longitud = _CABECERA_LOTE.unpack(cabecera)
+        datos = _leer_lsb(array_img, _CABECERA_LOTE.size, longitud)
+        if len(datos) != longitud:
+            raise ValueError(f"Cabecera dañada: indica {longitud} bytes y la imagen admite {len(datos)}")
+        return datos, {"id": id_mensaje.hex(), "indice": indice, "total": total}
+    return _extraer_de_array(array_img), None
+
+def _tarea_lote(tarea):
+    operacion, ruta, ruta_salida, datos = tarea
+    inicio = time.perf_counter()
+    resultado = {"ruta": ruta, "ok": True, "bytes_pixeles": 0, "bytes_mensaje": 0}
+    try:
+        array_img = _cargar_array(ruta)
+        resultado["bytes_pixeles"] = array_img.nbytes
+        if operacion == "ocultar":
+            datos, id_mensaje, indice, total = datos
+            _guardar_atomico(_ocultar_fragmento(array_img, datos, id_mensaje, indice, total), ruta_salida)
+            resultado.update(salida=ruta_salida, indice=indice, total=total)
+        else:
+            datos, fragmento = _extraer_fragmento(array_img)
+            if fragmento is not None:
+                resultado.update(fragmento)
+            resultado["datos"] = datos
+            resultado["mensaje"] = datos.decode('utf-8', errors='replace')
+        resultado["bytes_mensaje"] = len(datos)
+    except Exception as e:
+        resultado.update(ok=False, error=f"{type(e).__name__}: {e}")
+    resultado["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+def _procesar_en_pool(tareas, procesos=None, en_vuelo_por_proceso=4):
+    procesos = procesos or os.cpu_count() or 1
+    pendientes = deque()
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for tarea in tareas:
+            pendientes.append(pool.submit(_tarea_lote, tarea))
+            if len(pendientes) >= procesos * en_vuelo_por_proceso:
+                yield pendientes.popleft().result()
+        while pendientes:
+            yield pendientes.popleft().result()
+
+def _ejecutar_lote(tareas, procesos):
+    inicio = time.perf_counter()
+    resultados = list(_procesar_en_pool(tareas, procesos))
+    segundos = time.perf_counter() - inicio
+    correctos = [r for r in resultados if r["ok"]]
+    mb = sum(r["bytes_pixeles"] for r in correctos) / 1e6
+    return resultados, {
+        "procesos": procesos or os.cpu_count() or 1,
+        "imagenes": len(resultados),
+        "errores": len(resultados) - len(correctos),
+        "segundos": segundos,
+        "imagenes_s": len(correctos) / segundos if segundos else 0.0,
+        "mb_s": mb / segundos if segundos else 0.0,
+    }
+
+def repartir_por_capacidad(datos, rutas):
+    # Trocea 'datos' en orden según la capacidad de cada imagen.
+    # Devuelve [(ruta, fragmento), ...] solo con las imágenes necesarias.
+    reparto, inicio = [], 0
+    for ruta in rutas:
+        if inicio >= len(datos):
             break
-        mensaje += chr(int(byte, 2))
-    
-    return mensaje
+        capacidad = capacidad_imagen(ruta)
+        if capacidad:
+            reparto.append((ruta, datos[inicio:inicio + capacidad]))
+            inicio += capacidad
+    if inicio < len(datos):
+        raise ValueError(f"Las imágenes admiten {inicio} bytes y el mensaje ocupa {len(datos)}")
+    return reparto
+
+def ocultar_lote(rutas, mensaje, directorio_salida, procesos=None, dividir=False):
+    # Oculta 'mensaje' (str o bytes, puede contener cualquier byte) en cada imagen
+    # de 'rutas' (archivos o directorios), o lo reparte entre ellas si dividir=True.
+    # Devuelve (resultados, estadisticas).
+    datos = mensaje.encode('utf-8') if isinstance(mensaje, str) else bytes(mensaje)
+    id_mensaje = hashlib.sha256(datos).digest()[:8]
+    os.makedirs(directorio_salida, exist_ok=True)
+    if dividir:
+        reparto = repartir_por_capacidad(datos, listar_imagenes(rutas))
+        pares = ((ruta, (fragmento, id_mensaje, i, len(reparto))) for i, (ruta, fragmento) in enumerate(reparto))
+    else:
+        pares = ((ruta, (datos, id_mensaje, 0, 1)) for ruta in listar_imagenes(rutas))
 
-# Crear imagen de ejemplo si no existe
-img_ejemplo = np.random.randint(0, 256, (50, 50, 3), dtype=np.uint8)
-Image.fromarray(img_ejemplo).save("imagen_ejemplo.png")
+    usados = set()  # nombres de salida ya asignados (en minúsculas: hay sistemas de archivos que no distinguen)
+    def salida_para(ruta):
+        base = os.path.splitext(os.path.basename(ruta))[0]
+        nombre, n = base + ".png", 1
+        while nombre.lower() in usados:
+            n += 1
+            nombre = f"{base}-{n}.png"
+        usados.add(nombre.lower())
+        return os.path.join(directorio_salida, nombre)
 
-# Ocultar y extraer mensaje
-resultado_estego = ocultar_mensaje_lsb("imagen_ejemplo.png", mensaje_secreto, "imagen_oculta.png")
-mensaje_extraido = extraer_mensaje_lsb("imagen_oculta.png")
-print(f"{resultado_estego}")
-print(f"Mensaje extraído: {mensaje_extraido}")
+    tareas = (("ocultar", ruta, salida_para(ruta), fragmento) for ruta, fragmento in pares)
+    return _ejecutar_lote(tareas, procesos)
+
+def extraer_lote(rutas, procesos=None):
+    # Extrae el mensaje de cada imagen. Devuelve (resultados, estadisticas);
+    # cada resultado lleva 'datos' (bytes) y 'mensaje' (texto).
+    tareas = (("extraer", ruta, None, None) for ruta in listar_imagenes(rutas))
+    return _ejecutar_lote(tareas, procesos)
+
+def unir_fragmentos(resultados, como_bytes=False):
+    # Reconstruye un mensaje repartido con dividir=True: ordena los fragmentos por
+    # la posición de su cabecera (no por el orden de los archivos), exige que estén
+    # todos y que sean del mismo mensaje, y comprueba el resumen SHA-256 del resultado.
+    # Une bytes antes de decodificar, ya que un corte puede caer en mitad de un
+    # carácter UTF-8; con como_bytes=True devuelve los bytes (datos binarios).
+    fragmentos = [r for r in resultados if r["ok"] and "id" in r]
+    if not fragmentos:
+        raise ValueError("Ninguna imagen contiene un fragmento de un lote")
+    ids = {r["id"] for r in fragmentos}
+    if len(ids) > 1:
+        raise ValueError(f"Hay fragmentos de {len(ids)} mensajes distintos")
+    total = fragmentos[0]["total"]
+    por_indice = {r["indice"]: r["datos"] for r in fragmentos}
+    faltan = [i for i in range(total) if i not in por_indice]
+    if faltan:
+        raise ValueError(f"Faltan los fragmentos {faltan} de {total}")
+    datos = b"".join(por_indice[i] for i in range(total))
+    if hashlib.sha256(datos).digest()[:8].hex() != ids.pop():
+        raise ValueError("El mensaje reconstruido no coincide con su resumen SHA-256")
+    return datos if como_bytes else datos.decode('utf-8', errors='replace')
+
+def benchmark_lote(rutas, directorio_salida, lista_procesos=None, mensaje="x" * 256):
+    # Imágenes/s y MB/s de ocultar y extraer según el número de procesos
+    if lista_procesos is None:
+        maximo = os.cpu_count() or 1
+        lista_procesos = sorted({1, maximo} | {2 ** i for i in range(1, maximo.bit_length()) if 2 ** i < maximo})
+    rutas = list(listar_imagenes(rutas))
+    filas = []
+    for procesos in lista_procesos:
+        _, ocultar = ocultar_lote(rutas, mensaje, directorio_salida, procesos)
+        _, extraer = extraer_lote([directorio_salida], procesos)
+        filas.append({"procesos": procesos, "ocultar": ocultar, "extraer": extraer})
+    return filas
 
 # 3. OFUSCACIÓN (Transformación reversible)
-print("3. OFUSCACIÓN (Transformación reversible)")
 def ofuscar_mensaje(mensaje):
     # Ofuscar usando base64 y rotación de caracteres
     mensaje_b64 = base64.b64encode(mensaje.encode()).decode()
@@ -99,7 +320,183 @@ def desofuscar_mensaje(mensaje_ofuscado):
     mensaje = base64.b64decode(mensaje_b64.encode()).decode()
     return mensaje
 
-mensaje_ofuscado = ofuscar_mensaje(mensaje_secreto)
-mensaje_desofuscado = desofuscar_mensaje(mensaje_ofuscado)
-print(f"Mensaje ofuscado: {mensaje_ofuscado}")
-print(f"Mensaje desofuscado: {mensaje_desofuscado}")
\ No newline at end of file
+# ---------------------------
+# Benchmark: criptografía vs esteganografía vs ofuscación
+# ---------------------------
+'''
+Mide codificar/decodificar de cada técnica con cargas de 16 B a 10 MB:
+- Fernet: encrypt / decrypt.
+- LSB: _ocultar_en_array / _extraer_de_array sobre imágenes sintéticas en
+  memoria de varias resoluciones (sin PNG, que es coste de E/S y ya mide
+  benchmark_lote). Las combinaciones en las que la carga no cabe se omiten.
+- Ofuscación: ofuscar_mensaje / desofuscar_mensaje.
+Por fila: ops/s, MB/s (de carga útil), pico de memoria (tracemalloc, en una
+ejecución aparte para no falsear el tiempo) y expansión = salida / carga
+(para LSB, bytes de la imagen portadora / carga).
+La carga es ASCII imprimible: sin bytes 0 (el marcador de fin de LSB) y
+válida como str para la ofuscación.
+'''
+TAMAÑOS_BENCH = (16, 256, 4096, 65536, 1 << 20, 10 * (1 << 20))
+RESOLUCIONES_BENCH = ((256, 256), (1024, 1024), (4096, 4096))
+
+def _medir(funcion, tiempo_min=0.2, max_repeticiones=10_000):
+    repeticiones, inicio = 0, time.perf_counter()
+    while True:
+        funcion()
+        repeticiones += 1
+        transcurrido = time.perf_counter() - inicio
+        if transcurrido >= tiempo_min or repeticiones >= max_repeticiones:
+            break
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return transcurrido / repeticiones, pico
+
+def _fila(tecnica, operacion, tamaño, segundos_op, pico, bytes_salida, resolucion=None):
+    fila = {"tecnica": tecnica, "operacion": operacion, "tamaño_bytes": tamaño,
+            "ops_s": 1 / segundos_op, "mb_s": tamaño / segundos_op / 1e6,
+            "pico_memoria_bytes": pico, "expansion": bytes_salida / tamaño}
+    if resolucion:
+        fila["resolucion"] = f"{resolucion[0]}x{resolucion[1]}"
+    return fila
+
+def benchmark_tecnicas(tamaños=TAMAÑOS_BENCH, resoluciones=RESOLUCIONES_BENCH, tiempo_min=0.2):
+    cipher = _fernet.Fernet(_fernet.Fernet.generate_key())
+    imagenes = {res: np.random.randint(0, 256, (res[1], res[0], 3), dtype=np.uint8) for res in resoluciones}
+    filas, omitidos = [], []
+    for tamaño in tamaños:
+        datos = np.random.randint(32, 127, tamaño, dtype=np.uint8).tobytes()
+        texto = datos.decode('ascii')
+
+        # 1. Fernet
+        token = cipher.encrypt(datos)
+        t, pico = _medir(lambda: cipher.encrypt(datos), tiempo_min)
+        filas.append(_fila("fernet", "codificar", tamaño, t, pico, len(token)))
+        t, pico = _medir(lambda: cipher.decrypt(token), tiempo_min)
+        filas.append(_fila("fernet", "decodificar", tamaño, t, pico, tamaño))
+
+        # 2. LSB (una fila por resolución en la que cabe la carga)
+        for res, array_img in imagenes.items():
+            if tamaño + 1 > array_img.size // 8:
+                omitidos.append({"tecnica": "lsb", "tamaño_bytes": tamaño, "resolucion": f"{res[0]}x{res[1]}"})
+                continue
+            t, pico = _medir(lambda: _ocultar_en_array(array_img, datos), tiempo_min)
+            filas.append(_fila("lsb", "codificar", tamaño, t, pico, array_img.nbytes, res))
+            t, pico = _medir(lambda: _extraer_de_array(array_img), tiempo_min)
+            filas.append(_fila("lsb", "decodificar", tamaño, t, pico, tamaño, res))
+
+        # 3. Ofuscación
+        ofuscado = ofuscar_mensaje(texto)
+        t, pico = _medir(lambda: ofuscar_mensaje(texto), tiempo_min)
+        filas.append(_fila("ofuscacion", "codificar", tamaño, t, pico, len(ofuscado)))
+        t, pico = _medir(lambda: desofuscar_mensaje(ofuscado), tiempo_min)
+        filas.append(_fila("ofuscacion", "decodificar", tamaño, t, pico, tamaño))
+
+    return {"python": sys.version.split()[0], "tamaños": list(tamaños),
+            "resoluciones": [f"{a}x{h}" for a, h in resoluciones], "resultados": filas, "omitidos": omitidos}
+
+def guardar_informe_json(informe, ruta):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+
+def imprimir_tabla_tecnicas(informe):
+    print(f"{'técnica':<11}{'operación':<12}{'resolución':>11}{'tamaño':>11}"
+          f"{'ops/s':>12}{'MB/s':>10}{'pico mem':>12}{'expansión':>13}")
+    for f in informe["resultados"]:
+        print(f"{f['tecnica']:<11}{f['operacion']:<12}{f.get('resolucion', '-'):>11}{f['tamaño_bytes']:>11}"
+              f"{f['ops_s']:>12.1f}{f['mb_s']:>10.2f}{f['pico_memoria_bytes']:>12}{f['expansion']:>13.3f}")
+    if informe["omitidos"]:
+        print("LSB omitido (la carga no cabe): " +
+              ", ".join(f"{o['tamaño_bytes']} B en {o['resolucion']}" for o in informe["omitidos"]))
+
+
+# ---------------------------
+# Programa principal
+# ---------------------------
+# Las funciones van arriba y la demostración bajo __main__: los procesos del
+# pool importan este módulo y no deben volver a ejecutarla.
+if __name__ == "__main__" and "--ocultar-lote" in sys.argv:
+    # Uso: python Comparacion.py --ocultar-lote mensaje.txt DIR_SALIDA IMAGEN|DIR... [--dividir] [--procesos=N]
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    procesos = next((int(a.split("=", 1)[1]) for a in sys.argv if a.startswith("--procesos=")), None)
+    with open(argumentos[0], encoding="utf-8") as f:
+        mensaje = f.read()
+    resultados, resumen = ocultar_lote(argumentos[2:], mensaje, argumentos[1], procesos,
+                                       dividir="--dividir" in sys.argv)
+    for r in resultados:
+        print(f"{r['ruta']} -> {r['salida']} ({r['bytes_mensaje']} bytes)" if r["ok"]
+              else f"{r['ruta']}: ERROR {r['error']}")
+    print(f"{resumen['imagenes']} imágenes ({resumen['errores']} errores) en {resumen['segundos']:.2f}s - "
+          f"{resumen['imagenes_s']:.1f} img/s, {resumen['mb_s']:.1f} MB/s", file=sys.stderr)
+
+elif __name__ == "__main__" and "--extraer-lote" in sys.argv:
+    # Uso: python Comparacion.py --extraer-lote IMAGEN|DIR... [--unir] [--procesos=N]
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    procesos = next((int(a.split("=", 1)[1]) for a in sys.argv if a.startswith("--procesos=")), None)
+    resultados, resumen = extraer_lote(argumentos, procesos)
+    if "--unir" in sys.argv:
+        print(unir_fragmentos(resultados))
+    for r in resultados:
+        if not r["ok"]:
+            print(f"{r['ruta']}: ERROR {r['error']}", file=sys.stderr)
+        elif "--unir" not in sys.argv:
+            print(f"{r['ruta']}: {r['mensaje']}")
+    print(f"{resumen['imagenes']} imágenes ({resumen['errores']} errores) en {resumen['segundos']:.2f}s - "
+          f"{resumen['imagenes_s']:.1f} img/s, {resumen['mb_s']:.1f} MB/s", file=sys.stderr)
+
+elif __name__ == "__main__" and "--bench" in sys.argv:
+    # Uso: python Comparacion.py --bench [informe.json]
+    argumentos = [a for a in sys.argv[1:] if a != "--bench"]
+    informe = benchmark_tecnicas()
+    imprimir_tabla_tecnicas(informe)
+    if argumentos:
+        guardar_informe_json(informe, argumentos[0])
+
+elif __name__ == "__main__" and "--bench-lote" in sys.argv:
+    # Uso: python Comparacion.py --bench-lote DIR_IMAGENES DIR_SALIDA [procesos...]
+    argumentos = [a for a in sys.argv[1:] if a != "--bench-lote"]
+    lista_procesos = [int(a) for a in argumentos[2:]] or None
+    for fila in benchmark_lote([argumentos[0]], argumentos[1], lista_procesos):
+        o, e = fila["ocultar"], fila["extraer"]
+        print(f"{fila['procesos']} proceso(s): ocultar {o['imagenes_s']:.1f} img/s ({o['mb_s']:.1f} MB/s), "
+              f"extraer {e['imagenes_s']:.1f} img/s ({e['mb_s']:.1f} MB/s)")
+
+elif __name__ == "__main__":
+    # Mensaje secreto a proteger
+    mensaje_secreto = "El ataque será a las 15:00 en punto"
+
+    print("=== COMPARACIÓN DE TÉCNICAS DE SEGURIDAD ===")
+    print(f"Mensaje original: {mensaje_secreto}\n")
+
+    # 1. CRIPTOGRAFÍA (Cifrado AES con Fernet)
+    print("1. CRIPTOGRAFÍA (Cifrado AES)")
+    # Generar clave de cifrado
+    clave = _fernet.Fernet.generate_key()
+    cipher = _fernet.Fernet(clave)
+    # Cifrar mensaje
+    mensaje_cifrado = cipher.encrypt(mensaje_secreto.encode())
+    print(f"Mensaje cifrado: {mensaje_cifrado.decode()}")
+    # Descifrar mensaje
+    mensaje_descifrado = cipher.decrypt(mensaje_cifrado).decode()
+    print(f"Mensaje descifrado: {mensaje_descifrado}")
+    print("→ Evidente que hay información cifrada pero no se puede leer sin clave\n")
+
+    # 2. ESTEGANOGRAFÍA (Ocultar en imagen LSB)
+    print("2. ESTEGANOGRAFÍA (Ocultar en imagen)")
+    # Crear imagen de ejemplo si no existe
+    img_ejemplo = np.random.randint(0, 256, (50, 50, 3), dtype=np.uint8)
+    Image.fromarray(img_ejemplo).save("imagen_ejemplo.png")
+
+    # Ocultar y extraer mensaje
+    resultado_estego = ocultar_mensaje_lsb("imagen_ejemplo.png", mensaje_secreto, "imagen_oculta.png")
+    mensaje_extraido = extraer_mensaje_lsb("imagen_oculta.png")
+    print(f"{resultado_estego}")
+    print(f"Mensaje extraído: {mensaje_extraido}")
+
+    # 3. OFUSCACIÓN (Transformación reversible)
+    print("3. OFUSCACIÓN (Transformación reversible)")
+    mensaje_ofuscado = ofuscar_mensaje(mensaje_secreto)
+    mensaje_desofuscado = desofuscar_mensaje(mensaje_ofuscado)
+    print(f"Mensaje ofuscado: {mensaje_ofuscado}")
+    print(f"Mensaje desofuscado: {mensaje_desofuscado}")
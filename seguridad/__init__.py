@@ -0,0 +1,79 @@
+# Taller de Criptografía - Paquete importable con los puntos del taller
+# Autores: Guillermo Campo y Daniel Zambrano
+# Universidad Militar Nueva Granada
+
+import importlib
+import importlib.util
+import os
+import sys
+
+'''
+ PAQUETE "seguridad"
+ ================================================================
+ Los puntos del taller siguen siendo scripts independientes
+ (python 4_FirmaDigital.py ...), pero también se pueden importar
+ como librería sin efectos secundarios:
+
+     import seguridad
+     seguridad.firma.firmar(...)
+     seguridad.comparacion.ocultar_lote(...)
+
+ - Cada submódulo se carga la primera vez que se accede a él.
+ - La demostración de cada script está bajo "if __name__ == '__main__'",
+   así que importar no genera claves, no escribe archivos ni imprime.
+ - Las dependencias pesadas (cryptography, PIL, NumPy, requests) se
+   cargan con importar_perezoso(): el import es inmediato y el coste real
+   se paga en el primer uso de un atributo del módulo.
+
+ Los archivos viven en la carpeta del taller, que se añade a __path__:
+ así "seguridad.4_FirmaDigital" es un nombre importable de verdad (lo
+ necesita pickle, p. ej. en los procesos del pool de Comparacion.py).
+================================================================
+'''
+
+__path__.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODULOS = {
+    "cesar": "1A_CifradoCesar",
+    "vigenere": "1B_CifradoVigenere",
+    "fernet": "1C_CifradoSimetricoModerno_Fernet",
+    "hash_hmac": "2ABC_Hash_HMAC",
+    "hash_sal": "3_Hash_Sal",
+    "firma": "4_FirmaDigital",
+    "blockchain": "5_BlockChain_Basic",
+    "https": "6_HttpsRequest",
+    "comparacion": "Comparacion",
+}
+
+__all__ = ["importar_perezoso", *MODULOS]
+
+
+def importar_perezoso(nombre):
+    """
+    Importa 'nombre' de forma diferida: devuelve el módulo enseguida y lo
+    ejecuta en el primer acceso a uno de sus atributos.
+    Si ya estaba importado, lo devuelve tal cual.
+    """
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    spec = importlib.util.find_spec(nombre)
+    if spec is None:
+        raise ModuleNotFoundError(f"No se encontró el módulo {nombre!r}", name=nombre)
+    cargador = importlib.util.LazyLoader(spec.loader)
+    spec.loader = cargador
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = modulo
+    cargador.exec_module(modulo)
+    return modulo
+
+
+def __getattr__(nombre):
+    if nombre not in MODULOS:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    modulo = importlib.import_module(f"{__name__}.{MODULOS[nombre]}")
+    globals()[nombre] = modulo
+    return modulo
+
+
+def __dir__():
+    return sorted(set(globals()) | set(MODULOS))
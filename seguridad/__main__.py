@@ -0,0 +1,89 @@
+# Taller de Criptografía - Herramientas del paquete "seguridad"
+# Autores: Guillermo Campo y Daniel Zambrano
+# Universidad Militar Nueva Granada
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import seguridad
+from seguridad import MODULOS, metricas
+
+'''
+ TIEMPO DE IMPORTACIÓN POR SUBMÓDULO
+ ================================================================
+ Importa cada script del taller en un intérprete nuevo con
+ "python -X importtime" y toma el tiempo acumulado de su entrada
+ (incluye todo lo que importa y ejecuta al importarse). Se repite
+ varias veces y se informa la mediana, en milisegundos.
+
+ Uso:  python -m seguridad --importtime [DIRECTORIO] [repeticiones]
+ DIRECTORIO permite medir otra copia del taller (p. ej. una versión
+ anterior extraída con git archive) para comparar antes/después.
+================================================================
+'''
+
+DIRECTORIO_TALLER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def tiempo_importacion(nombre, directorio=DIRECTORIO_TALLER):
+    """Milisegundos acumulados que tarda en importarse 'nombre' (un intento)."""
+    codigo = f"__import__({nombre!r})"  # __import__ (no importlib) para que -X importtime lo registre
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=directorio,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    for linea in proceso.stderr.splitlines():
+        # Formato: "import time: <propio> | <acumulado> | <nombre>"
+        partes = linea.split("|")
+        if len(partes) == 3 and partes[2].strip() == nombre:
+            return int(partes[1]) / 1000
+    raise RuntimeError(f"No se pudo importar {nombre} en {directorio}:\n{proceso.stderr[-2000:]}")
+
+
+def tiempos_importacion(directorio=DIRECTORIO_TALLER, repeticiones=5):
+    """Mediana del tiempo de importación de cada submódulo: {nombre_archivo: ms}."""
+    resultados = {}
+    for archivo in MODULOS.values():
+        tiempo_importacion(archivo, directorio)  # calentar caché de .pyc
+        tiempos = sorted(tiempo_importacion(archivo, directorio) for _ in range(repeticiones))
+        resultados[archivo] = tiempos[len(tiempos) // 2]
+    return resultados
+
+
+def carga_de_ejemplo(repeticiones=200):
+    """Ejecuta una carga pequeña sobre las operaciones instrumentadas (sin red)."""
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "datos.bin")
+        with open(ruta, "wb") as f:
+            f.write(os.urandom(1 << 20))
+        for _ in range(repeticiones):
+            seguridad.cesar.cifrar_cesar("La criptografia es fascinante", 3)
+            seguridad.vigenere.cifrar_vigenere("ATAQUE AL AMANECER", "LIMON")
+            seguridad.hash_hmac.generar_hmac("mensaje", "clave")
+        for _ in range(5):
+            seguridad.hash_hmac.hash_archivo(ruta)
+        sistema = seguridad.hash_sal.SistemaAutenticacion(os.path.join(directorio, "usuarios.json"))
+        sistema.registrar_usuario("ana", "clave-segura")
+        sistema.iniciar_sesion("ana", "clave-segura")
+        sistema.iniciar_sesion("ana", "otra")
+        cadena = seguridad.blockchain.Blockchain()
+        for i in range(repeticiones):
+            cadena.agregar_bloque({"tx": i})
+        cadena.es_cadena_valida(completa=True)
+
+
+if __name__ == "__main__" and "--metricas" in sys.argv:
+    # Uso: python -m seguridad --metricas [--json] [--perfil]
+    metricas.activar(perfilar="--perfil" in sys.argv, memoria=True, muestreo=50)
+    carga_de_ejemplo()
+    print(metricas.exportar_json() if "--json" in sys.argv else metricas.exportar_prometheus(), end="")
+    if "--perfil" in sys.argv:
+        print(metricas.informe_perfil(limite=10))
+
+elif __name__ == "__main__" and "--importtime" in sys.argv:
+    argumentos = [a for a in sys.argv[1:] if a != "--importtime"]
+    directorio = argumentos[0] if argumentos else DIRECTORIO_TALLER
+    repeticiones = int(argumentos[1]) if len(argumentos) > 1 else 5
+    print(f"{'Submódulo':<36} {'Importación (ms)':>17}")
+    for archivo, ms in tiempos_importacion(directorio, repeticiones).items():
+        print(f"{archivo:<36} {ms:>17.1f}")
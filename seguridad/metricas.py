@@ -0,0 +1,255 @@
+# Taller de Criptografía - Métricas y perfilado de las operaciones del taller
+# Autores: Guillermo Campo y Daniel Zambrano
+# Universidad Militar Nueva Granada
+
+import bisect
+import functools
+import os
+import threading
+import time
+
+# cProfile, pstats, tracemalloc y json se importan dentro de las funciones que
+# los usan: este módulo lo importan todos los del taller, y cargarlos aquí
+# costaría decenas de milisegundos aunque las métricas estén desactivadas.
+
+'''
+ MÉTRICAS Y PERFILADO
+ ================================================================
+ Las funciones críticas del taller se decoran con @instrumentar:
+
+     from seguridad.metricas import instrumentar
+
+     @instrumentar
+     def cifrar_cesar(texto, clave): ...
+
+ Desactivado (por defecto) el decorador solo añade una llamada y la
+ consulta de un booleano global. Activado (activar() o la variable de
+ entorno SEGURIDAD_METRICAS=1) registra por operación:
+   - llamadas y errores (contadores),
+   - latencia en un histograma de cubetas fijas (segundos),
+   - opcionalmente, 1 de cada N llamadas bajo cProfile y/o tracemalloc
+     (pico de memoria de la llamada).
+ El nombre de la operación es el __qualname__ de la función
+ ("cifrar_cesar", "Blockchain.agregar_bloque", ...).
+
+ instantanea() / exportar_json() / exportar_prometheus() devuelven el
+ estado acumulado; reiniciar() lo borra. Las métricas son por proceso:
+ los trabajadores de un pool llevan las suyas.
+================================================================
+'''
+
+# Límites superiores de las cubetas de latencia (segundos), como en Prometheus
+CUBETAS_LATENCIA = (0.000_001, 0.000_005, 0.000_01, 0.000_05, 0.000_1, 0.000_5,
+                    0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+_ACTIVO = False
+_cerrojo = threading.Lock()
+_operaciones = {}          # nombre -> _Operacion
+_perfil = None             # cProfile.Profile compartido (si perfilar=True)
+_muestreo = 0              # 0 = sin muestreo; N = 1 de cada N llamadas
+_memoria = False
+_tracemalloc_propio = False  # tracemalloc lo arrancó activar() (y lo para desactivar())
+_cerrojo_muestreo = threading.Lock()  # una sola llamada muestreada a la vez
+
+
+class _Operacion:
+    __slots__ = ("llamadas", "errores", "suma_s", "cubetas", "muestras", "pico_memoria_bytes")
+
+    def __init__(self):
+        self.llamadas = 0
+        self.errores = 0
+        self.suma_s = 0.0
+        self.cubetas = [0] * (len(CUBETAS_LATENCIA) + 1)  # la última es +Inf
+        self.muestras = 0
+        self.pico_memoria_bytes = 0
+
+    def registrar(self, segundos, error):
+        self.llamadas += 1
+        self.errores += error
+        self.suma_s += segundos
+        self.cubetas[bisect.bisect_left(CUBETAS_LATENCIA, segundos)] += 1
+
+
+def activar(perfilar=False, memoria=False, muestreo=100):
+    """
+    Activa el registro de métricas.
+    - perfilar: acumula cProfile de las llamadas muestreadas (ver informe_perfil()).
+    - memoria: mide con tracemalloc el pico de memoria de las llamadas muestreadas.
+    - muestreo: se muestrea 1 de cada 'muestreo' llamadas de cada operación.
+    """
+    global _ACTIVO, _perfil, _muestreo, _memoria, _tracemalloc_propio
+    import cProfile
+    import tracemalloc
+    with _cerrojo:
+        _perfil = cProfile.Profile() if perfilar else None
+        _memoria = memoria
+        _muestreo = max(int(muestreo), 1) if (perfilar or memoria) else 0
+        if memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_propio = True
+        _ACTIVO = True
+
+
+def desactivar():
+    """Deja de registrar (lo acumulado se conserva hasta reiniciar())."""
+    global _ACTIVO, _tracemalloc_propio
+    _ACTIVO = False
+    if _tracemalloc_propio:
+        import tracemalloc
+        tracemalloc.stop()
+        _tracemalloc_propio = False
+
+
+def activo():
+    return _ACTIVO
+
+
+def reiniciar():
+    """Borra todas las métricas y el perfil acumulado."""
+    global _perfil
+    with _cerrojo:
+        _operaciones.clear()
+        if _perfil is not None:
+            import cProfile
+            _perfil = cProfile.Profile()
+
+
+def _operacion(nombre):
+    operacion = _operaciones.get(nombre)
+    if operacion is None:
+        operacion = _operaciones.setdefault(nombre, _Operacion())
+    return operacion
+
+
+def _llamar_muestreada(operacion, funcion, args, kwargs):
+    # cProfile y el pico de tracemalloc son globales: si ya hay otra llamada
+    # muestreada (en otro hilo, o anidada como descifrar -> cifrar), esta se
+    # ejecuta sin muestrear.
+    if not _cerrojo_muestreo.acquire(blocking=False):
+        return funcion(*args, **kwargs)
+    perfil = _perfil
+    try:
+        if _memoria:
+            import tracemalloc
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        if perfil is not None:
+            perfil.enable()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            if perfil is not None:
+                perfil.disable()
+            if _memoria:
+                pico = tracemalloc.get_traced_memory()[1] - base
+                with _cerrojo:
+                    operacion.muestras += 1
+                    operacion.pico_memoria_bytes = max(operacion.pico_memoria_bytes, pico)
+    finally:
+        _cerrojo_muestreo.release()
+
+
+def instrumentar(funcion):
+    """Decorador: mide cada llamada a 'funcion' cuando las métricas están activas."""
+    nombre = funcion.__qualname__
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        if not _ACTIVO:
+            return funcion(*args, **kwargs)
+        operacion = _operacion(nombre)
+        error = 1
+        inicio = time.perf_counter()
+        try:
+            if _muestreo and operacion.llamadas % _muestreo == 0:
+                resultado = _llamar_muestreada(operacion, funcion, args, kwargs)
+            else:
+                resultado = funcion(*args, **kwargs)
+            error = 0
+            return resultado
+        finally:
+            segundos = time.perf_counter() - inicio
+            with _cerrojo:
+                operacion.registrar(segundos, error)
+
+    return envoltura
+
+
+# ---------------------------
+# Exportación
+# ---------------------------
+def instantanea():
+    """Copia del estado actual: {operacion: {llamadas, errores, suma_s, media_s, cubetas, ...}}."""
+    with _cerrojo:
+        datos = {}
+        for nombre, op in sorted(_operaciones.items()):
+            acumulado, cubetas = 0, {}
+            for limite, n in zip((*CUBETAS_LATENCIA, "+Inf"), op.cubetas):
+                acumulado += n
+                cubetas[str(limite)] = acumulado
+            datos[nombre] = {
+                "llamadas": op.llamadas,
+                "errores": op.errores,
+                "suma_s": op.suma_s,
+                "media_s": op.suma_s / op.llamadas if op.llamadas else 0.0,
+                "cubetas": cubetas,  # acumuladas: llamadas con latencia <= límite
+            }
+            if op.muestras:
+                datos[nombre]["pico_memoria_bytes"] = op.pico_memoria_bytes
+        return datos
+
+
+def exportar_json(indent=2):
+    import json
+    return json.dumps({"timestamp": time.time(), "operaciones": instantanea()}, indent=indent)
+
+
+def exportar_prometheus(prefijo="seguridad"):
+    """Instantánea en formato de texto de Prometheus (exposition format 0.0.4)."""
+    datos = instantanea()
+    lineas = [
+        f"# HELP {prefijo}_llamadas_total Llamadas por operación.",
+        f"# TYPE {prefijo}_llamadas_total counter",
+    ]
+    lineas += [f'{prefijo}_llamadas_total{{operacion="{n}"}} {d["llamadas"]}' for n, d in datos.items()]
+    lineas += [
+        f"# HELP {prefijo}_errores_total Llamadas que terminaron con excepción.",
+        f"# TYPE {prefijo}_errores_total counter",
+    ]
+    lineas += [f'{prefijo}_errores_total{{operacion="{n}"}} {d["errores"]}' for n, d in datos.items()]
+    lineas += [
+        f"# HELP {prefijo}_latencia_segundos Latencia por operación.",
+        f"# TYPE {prefijo}_latencia_segundos histogram",
+    ]
+    for n, d in datos.items():
+        for limite, acumulado in d["cubetas"].items():
+            lineas.append(f'{prefijo}_latencia_segundos_bucket{{operacion="{n}",le="{limite}"}} {acumulado}')
+        lineas.append(f'{prefijo}_latencia_segundos_sum{{operacion="{n}"}} {d["suma_s"]}')
+        lineas.append(f'{prefijo}_latencia_segundos_count{{operacion="{n}"}} {d["llamadas"]}')
+    con_memoria = {n: d for n, d in datos.items() if "pico_memoria_bytes" in d}
+    if con_memoria:
+        lineas += [
+            f"# HELP {prefijo}_memoria_pico_bytes Mayor pico de memoria (tracemalloc) en las llamadas muestreadas.",
+            f"# TYPE {prefijo}_memoria_pico_bytes gauge",
+        ]
+        lineas += [f'{prefijo}_memoria_pico_bytes{{operacion="{n}"}} {d["pico_memoria_bytes"]}'
+                   for n, d in con_memoria.items()]
+    return "\n".join(lineas) + "\n"
+
+
+def informe_perfil(orden="cumulative", limite=20):
+    """Texto de pstats con el cProfile acumulado de las llamadas muestreadas ('' si no hay)."""
+    if _perfil is None:
+        return ""
+    import io
+    import pstats
+    salida = io.StringIO()
+    try:
+        pstats.Stats(_perfil, stream=salida).sort_stats(orden).print_stats(limite)
+    except TypeError:  # perfil vacío: aún no hubo llamadas muestreadas
+        return ""
+    return salida.getvalue()
+
+
+if os.environ.get("SEGURIDAD_METRICAS", "") not in ("", "0"):
+    activar()